@@ -0,0 +1,41 @@
+"""
+FileService.append_file のベンチマーク
+ファイルが大きくなっても、1回あたりの追記コストが一定であることを確認します。
+
+実行方法（mock_practice ディレクトリで）:
+    python benchmarks/bench_append_file.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# services をインポートできるようにパスを追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.file_service import FileService
+
+
+def main(rounds: int = 5, appends_per_round: int = 2000) -> None:
+    service = FileService()
+    line = "x" * 100 + "\n"
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = str(Path(tmp_dir) / "audit.log")
+        service.write_file(file_path, "")
+        
+        print(f"{'round':>5} {'file size (KB)':>15} {'us/append':>10}")
+        for i in range(rounds):
+            start = time.perf_counter()
+            for _ in range(appends_per_round):
+                service.append_file(file_path, line)
+            elapsed = time.perf_counter() - start
+            
+            size_kb = Path(file_path).stat().st_size / 1024
+            per_append_us = elapsed / appends_per_round * 1_000_000
+            print(f"{i + 1:>5} {size_kb:>15.0f} {per_append_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+AsyncFileService のベンチマーク
+同期の FileService を直接呼んだ場合と比べて、イベントループの停止時間を計測します。
+
+実行方法（mock_practice ディレクトリで）:
+    python benchmarks/bench_async_file_service.py
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# services をインポートできるようにパスを追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.async_file_service import AsyncFileService
+from services.file_service import FileService
+
+
+TICK = 0.001
+
+
+async def measure_stall(workload) -> tuple:
+    """workload 実行中に、1ms 間隔のタイマーがどれだけ遅れたかを計測する"""
+    max_lag = 0.0
+    done = False
+    
+    async def ticker():
+        nonlocal max_lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            max_lag = max(max_lag, time.perf_counter() - start - TICK)
+    
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await workload()
+    elapsed = time.perf_counter() - start
+    done = True
+    await ticker_task
+    return elapsed, max_lag
+
+
+def main(file_count: int = 200, file_size: int = 256 * 1024) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [str(Path(tmp_dir) / f"file_{i}.txt") for i in range(file_count)]
+        sync_service = FileService()
+        for path in paths:
+            sync_service.write_file(path, "x" * file_size)
+        
+        async_service = AsyncFileService(file_service=sync_service)
+        
+        async def sync_workload():
+            for path in paths:
+                sync_service.read_file(path)
+        
+        async def async_workload():
+            await asyncio.gather(*(async_service.read_file(path) for path in paths))
+        
+        print(f"{'mode':>6} {'total (ms)':>11} {'max stall (ms)':>15}")
+        for name, workload in [("sync", sync_workload), ("async", async_workload)]:
+            elapsed, max_lag = asyncio.run(measure_stall(workload))
+            print(f"{name:>6} {elapsed * 1000:>11.1f} {max_lag * 1000:>15.1f}")
+        
+        async_service.close()
+
+
+if __name__ == "__main__":
+    main()
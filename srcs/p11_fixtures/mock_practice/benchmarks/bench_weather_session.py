@@ -0,0 +1,50 @@
+"""
+WeatherService のコネクション再利用のベンチマーク
+毎回 requests.get を呼ぶ場合と、Session を保持する WeatherService を比較します。
+
+実行方法（mock_practice ディレクトリで）:
+    python benchmarks/bench_weather_session.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+# services と tests をインポートできるようにパスを追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.weather_service import WeatherService
+from tests.weather_stub import start_weather_stub_server
+
+
+def main(calls: int = 500) -> None:
+    server = start_weather_stub_server()
+    params = {"city": "Tokyo", "api_key": "bench"}
+    
+    try:
+        start = time.perf_counter()
+        for _ in range(calls):
+            requests.get(f"{server.url}/weather", params=params).json()
+        plain_elapsed = time.perf_counter() - start
+        
+        with WeatherService(api_key="bench") as service:
+            service.base_url = server.url
+            start = time.perf_counter()
+            for _ in range(calls):
+                service.get_weather("Tokyo")
+            session_elapsed = time.perf_counter() - start
+            stats = service.get_connection_stats()
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    print(f"{'mode':>14} {'us/call':>10}")
+    print(f"{'requests.get':>14} {plain_elapsed / calls * 1_000_000:>10.1f}")
+    print(f"{'WeatherService':>14} {session_elapsed / calls * 1_000_000:>10.1f}")
+    print(f"connection stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ from unittest.mock import Mock
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
+from tests.weather_stub import start_weather_stub_server
+
 
 # ============================================
 # 共通フィクスチャ
@@ -95,3 +97,17 @@ def sample_user_data():
         "email": "alice@example.com"
     }
 
+
+@pytest.fixture
+def weather_stub_server():
+    """
+    ローカルで天気APIを模擬するHTTPサーバーを起動するフィクスチャ
+    
+    Usage:
+        service.base_url = weather_stub_server.url
+        weather_stub_server.request_count  # 受け付けたリクエスト数
+    """
+    server = start_weather_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
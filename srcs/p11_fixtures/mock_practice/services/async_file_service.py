@@ -0,0 +1,89 @@
+"""
+非同期ファイル操作サービス
+FileService の処理をスレッドプールで実行し、イベントループをブロックしないようにします。
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from services.file_service import FileService
+
+
+# 同時に実行するファイル操作のデフォルトの上限
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncFileService:
+    """非同期ファイル操作サービスクラス"""
+    
+    def __init__(
+        self,
+        file_service: Optional[FileService] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ):
+        """
+        初期化
+        
+        Args:
+            file_service: 実際の処理を行う FileService（None の場合は新規作成）
+            max_concurrency: 同時に実行するファイル操作の上限
+        """
+        self.file_service = file_service or FileService()
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def read_file(self, file_path: str) -> str:
+        """
+        ファイルを読み込む
+        
+        Args:
+            file_path: ファイルパス
+            
+        Returns:
+            ファイルの内容
+        """
+        return await self._run(self.file_service.read_file, file_path)
+    
+    async def write_file(self, file_path: str, content: str) -> None:
+        """
+        ファイルに書き込む
+        
+        Args:
+            file_path: ファイルパス
+            content: 書き込む内容
+        """
+        await self._run(self.file_service.write_file, file_path, content)
+    
+    async def append_file(self, file_path: str, content: str) -> None:
+        """
+        ファイルに追記する
+        
+        Args:
+            file_path: ファイルパス
+            content: 追記する内容
+        """
+        await self._run(self.file_service.append_file, file_path, content)
+    
+    async def file_exists(self, file_path: str) -> bool:
+        """
+        ファイルが存在するか確認
+        
+        Args:
+            file_path: ファイルパス
+            
+        Returns:
+            存在する場合はTrue
+        """
+        return await self._run(self.file_service.file_exists, file_path)
+    
+    def close(self) -> None:
+        """スレッドプールを終了する"""
+        self._executor.shutdown(wait=True)
+    
+    async def _run(self, func, *args):
+        """同時実行数を制限しながら、関数をスレッドプールで実行する"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
@@ -0,0 +1,121 @@
+"""
+非同期で天気情報を取得するサービス
+aiohttp でコネクションを再利用しながら、イベントループをブロックせずに外部APIを呼び出します。
+"""
+
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from services.weather_service import DEFAULT_POOL_SIZE, shape_forecast, shape_weather
+
+
+# 同時に実行するリクエスト数のデフォルトの上限
+DEFAULT_MAX_CONCURRENCY = 10
+
+# デフォルトのタイムアウト（リクエスト全体）（秒）
+DEFAULT_TIMEOUT = 10.0
+
+
+class AsyncWeatherService:
+    """
+    非同期で天気情報を取得するサービスクラス
+    
+    WeatherService と同じ形のデータを返します。ClientSession は最初のリクエスト時に
+    実行中のイベントループ上で作成し、close() するまで再利用します。
+    
+    Usage:
+        async with AsyncWeatherService(api_key="...") as service:
+            weather = await service.get_weather("Tokyo")
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
+        """
+        初期化
+        
+        Args:
+            api_key: 天気APIのキー
+            pool_size: 保持するコネクション数の上限
+            max_concurrency: 同時に実行するリクエスト数の上限
+            timeout: リクエスト全体のタイムアウト（秒）
+        """
+        self.api_key = api_key
+        self.base_url = "https://api.weather.example.com"
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def get_weather(self, city: str) -> dict:
+        """
+        指定した都市の天気情報を取得
+        
+        Args:
+            city: 都市名
+            
+        Returns:
+            天気情報の辞書
+        """
+        params = {
+            "city": city,
+            "api_key": self.api_key
+        }
+        data = await self._get_json(f"{self.base_url}/weather", params)
+        return shape_weather(data)
+    
+    async def get_forecast(self, city: str, days: int = 3) -> list:
+        """
+        指定した都市の天気予報を取得
+        
+        Args:
+            city: 都市名
+            days: 予報日数（デフォルト: 3日）
+            
+        Returns:
+            天気予報のリスト
+        """
+        params = {
+            "city": city,
+            "days": days,
+            "api_key": self.api_key
+        }
+        data = await self._get_json(f"{self.base_url}/forecast", params)
+        return shape_forecast(data)
+    
+    async def close(self) -> None:
+        """保持しているコネクションを閉じる"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def __aenter__(self) -> "AsyncWeatherService":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """ClientSession を取得する（なければ作成する）"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+    
+    async def _get_json(self, url: str, params: dict) -> dict:
+        """同時実行数を制限しながら GET し、JSON を返す"""
+        # aiohttp はクエリパラメータに文字列しか受け付けない
+        params = {key: str(value) for key, value in params.items()}
+        async with self._semaphore:
+            async with self._get_session().get(url, params=params) as response:
+                response.raise_for_status()  # エラーがあれば例外を発生
+                return await response.json()
@@ -0,0 +1,235 @@
+"""
+コンテンツアドレス型ストア
+内容のハッシュ値をキーにしてファイルを保存し、同じ内容を重複して書き込まないようにします。
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from services.file_service import FileService
+
+
+# リンクのログを圧縮する目安（ログの行数が、この値と現在のリンク数の2倍の両方を超えたら圧縮する）
+LOG_COMPACT_MIN_RECORDS = 1024
+
+
+class ContentStore:
+    """
+    コンテンツアドレス型ストアクラス
+    
+    内容は SHA-256 のハッシュ値をファイル名として blobs/ 以下に1回だけ保存します。
+    名前付きのリンクは index.log に追記していき、ブロブごとの参照数が0になったら削除します。
+    
+    リンクの変更ごとにインデックス全体を書き直さないよう、index.log には変更を
+    1行ずつ追記して fsync します。起動時にログを先頭から再生してリンクと参照数を
+    復元し、ログが長くなったら現在のリンクだけのログにアトミックに置き換えます。
+    
+    ディレクトリ構成:
+        root/
+        ├── blobs/ab/cdef...   # ハッシュ値の先頭2文字でディレクトリを分ける
+        └── index.log          # 1行1件: {"name": 名前, "digest": ハッシュ値 または null（削除）}
+    """
+    
+    def __init__(self, root_dir: str, file_service: Optional[FileService] = None):
+        """
+        初期化
+        
+        Args:
+            root_dir: ストアのルートディレクトリ
+            file_service: ブロブの操作に使う FileService（None の場合はアトミック書き込みで新規作成）
+        """
+        self.root = Path(root_dir)
+        self.file_service = file_service or FileService(atomic_writes=True)
+        self._log_path = self.root / "index.log"
+        # ログはブロブの FileService の圧縮設定などに関係なく、そのまま読み書きする
+        self._log_service = FileService(atomic_writes=True)
+        self._lock = threading.Lock()
+        
+        self._links: Dict[str, str] = {}
+        self._refcounts: Dict[str, int] = {}
+        self._log_records = 0
+        if self._log_service.file_exists(str(self._log_path)):
+            self._replay_log()
+    
+    @staticmethod
+    def digest(content: str) -> str:
+        """
+        内容のハッシュ値を計算する
+        
+        Args:
+            content: 内容
+            
+        Returns:
+            SHA-256 のハッシュ値（16進数文字列）
+        """
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def has(self, digest: str) -> bool:
+        """
+        ハッシュ値に対応するブロブが存在するか確認
+        
+        Args:
+            digest: ハッシュ値
+            
+        Returns:
+            存在する場合はTrue
+        """
+        return self.file_service.file_exists(str(self._blob_path(digest)))
+    
+    def put(self, content: str) -> str:
+        """
+        内容を保存する（既に同じ内容があれば書き込まない）
+        
+        Args:
+            content: 内容
+            
+        Returns:
+            内容のハッシュ値
+        """
+        digest = self.digest(content)
+        with self._lock:
+            self._put_blob(digest, content)
+        return digest
+    
+    def get(self, digest: str) -> str:
+        """
+        ハッシュ値から内容を取得する
+        
+        Args:
+            digest: ハッシュ値
+            
+        Returns:
+            内容
+        """
+        return self.file_service.read_file(str(self._blob_path(digest)))
+    
+    def link(self, name: str, content: str) -> str:
+        """
+        内容を保存して、名前を付ける
+        
+        既に同じ名前が別の内容を指している場合は、付け替えます。
+        
+        Args:
+            name: 名前
+            content: 内容
+            
+        Returns:
+            内容のハッシュ値
+        """
+        digest = self.digest(content)
+        with self._lock:
+            # 存在確認から参照数の更新までをロック内で行い、並行する unlink に
+            # ブロブを削除されないようにする
+            self._put_blob(digest, content)
+            old_digest = self._links.get(name)
+            if old_digest == digest:
+                return digest
+            
+            self._append_log(name, digest)
+            self._links[name] = digest
+            self._refcounts[digest] = self._refcounts.get(digest, 0) + 1
+            if old_digest is not None:
+                self._release(old_digest)
+            self._maybe_compact()
+        return digest
+    
+    def read(self, name: str) -> str:
+        """
+        名前から内容を取得する
+        
+        Args:
+            name: 名前
+            
+        Returns:
+            内容
+        """
+        with self._lock:
+            digest = self._links.get(name)
+        if digest is None:
+            raise KeyError(f"Link not found: {name}")
+        return self.get(digest)
+    
+    def unlink(self, name: str) -> None:
+        """
+        名前を削除する（参照がなくなったブロブも削除される）
+        
+        Args:
+            name: 名前
+        """
+        with self._lock:
+            digest = self._links.get(name)
+            if digest is None:
+                raise KeyError(f"Link not found: {name}")
+            self._append_log(name, None)
+            del self._links[name]
+            self._release(digest)
+            self._maybe_compact()
+    
+    def _blob_path(self, digest: str) -> Path:
+        """ハッシュ値に対応するブロブのパス"""
+        return self.root / "blobs" / digest[:2] / digest[2:]
+    
+    def _put_blob(self, digest: str, content: str) -> None:
+        """ブロブがなければ書き込む（ロック取得済みで呼ぶこと）"""
+        if not self.has(digest):
+            self.file_service.write_file(str(self._blob_path(digest)), content)
+    
+    def _release(self, digest: str) -> None:
+        """参照数を減らし、0になったらブロブを削除する（ロック取得済みで呼ぶこと）"""
+        count = self._refcounts.get(digest, 0) - 1
+        if count > 0:
+            self._refcounts[digest] = count
+            return
+        self._refcounts.pop(digest, None)
+        try:
+            # FileService 経由で削除して、キャッシュとディレクトリ一覧も無効化する
+            self.file_service.delete_file(str(self._blob_path(digest)))
+        except FileNotFoundError:
+            pass
+    
+    def _replay_log(self) -> None:
+        """ログを先頭から再生して、リンクと参照数を復元する"""
+        lines = self._log_service.read_file(str(self._log_path)).splitlines()
+        for i, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 追記中に停止した最後の1行は無視する
+                if i == len(lines) - 1:
+                    break
+                raise
+            if record["digest"] is None:
+                self._links.pop(record["name"], None)
+            else:
+                self._links[record["name"]] = record["digest"]
+            self._log_records += 1
+        
+        for digest in self._links.values():
+            self._refcounts[digest] = self._refcounts.get(digest, 0) + 1
+    
+    def _append_log(self, name: str, digest: Optional[str]) -> None:
+        """リンクの変更を1行追記して fsync する（ロック取得済みで呼ぶこと）"""
+        line = json.dumps({"name": name, "digest": digest}) + "\n"
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            os.write(fd, line.encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._log_records += 1
+    
+    def _maybe_compact(self) -> None:
+        """ログが長くなったら、現在のリンクだけのログに置き換える（ロック取得済みで呼ぶこと）"""
+        if self._log_records <= max(LOG_COMPACT_MIN_RECORDS, 2 * len(self._links)):
+            return
+        lines = [
+            json.dumps({"name": name, "digest": digest}) + "\n"
+            for name, digest in self._links.items()
+        ]
+        self._log_service.write_file(str(self._log_path), "".join(lines))
+        self._log_records = len(lines)
@@ -3,12 +3,517 @@
 ファイルの読み書きを行います。
 """
 
+import bz2
+import codecs
+import errno
+import gzip
+import json
+import lzma
+import mmap
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from typing import IO, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# ストリーミング読み込みのデフォルトチャンクサイズ（バイト）
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# BufferedAppender のデフォルトのバッファ上限（バイト）
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+# read_many / write_many のデフォルトのスレッド数
+DEFAULT_MAX_WORKERS = 16
+
+# FileContentCache のデフォルトの容量上限（バイト）
+DEFAULT_CACHE_SIZE = 16 * 1024 * 1024
+
+# DirectoryIndex のデフォルトの有効期間（秒）と、保持するディレクトリ数の上限
+DEFAULT_DIR_INDEX_TTL = 1.0
+DEFAULT_DIR_INDEX_MAX_DIRS = 1024
+
+# 圧縮形式の名前と、対応する標準ライブラリのモジュール
+COMPRESSION_CODECS = {
+    "gzip": gzip,
+    "lzma": lzma,
+    "bz2": bz2,
+}
+
+# compression="auto" のときに、拡張子から判定する圧縮形式
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+    ".bz2": "bz2",
+}
+
+# copy_file で、カーネルのコピー機能が使えない場合のフォールバックを許すエラー
+_COPY_FALLBACK_ERRNOS = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.EPERM,
+    errno.EBADF,
+}
+
+# GroupCommitter が他の書き込みの合流を待つデフォルトの時間（秒）
+DEFAULT_GROUP_COMMIT_DELAY = 0.002
+
+
+def _copy_fd(in_fd: int, out_fd: int, size: int) -> int:
+    """
+    ファイルディスクリプタ間で内容をコピーする
+    
+    copy_file_range → sendfile → read/write の順に試し、
+    カーネル内でコピーできる場合はユーザー空間にデータを持ち込みません。
+    
+    Returns:
+        コピーしたバイト数
+    """
+    copied = 0
+    
+    for name in ("copy_file_range", "sendfile"):
+        func = getattr(os, name, None)
+        if func is None:
+            continue
+        try:
+            while copied < size:
+                count = min(size - copied, 1 << 30)
+                if name == "copy_file_range":
+                    sent = func(in_fd, out_fd, count, copied, copied)
+                else:
+                    os.lseek(out_fd, copied, os.SEEK_SET)
+                    sent = func(out_fd, in_fd, copied, count)
+                if sent == 0:
+                    # コピー中にファイルが短くなった
+                    return copied
+                copied += sent
+            return copied
+        except OSError as e:
+            if e.errno not in _COPY_FALLBACK_ERRNOS:
+                raise
+    
+    # フォールバック: チャンク単位で読み込んで書き込む
+    os.lseek(in_fd, copied, os.SEEK_SET)
+    os.lseek(out_fd, copied, os.SEEK_SET)
+    while True:
+        data = os.read(in_fd, DEFAULT_CHUNK_SIZE)
+        if not data:
+            return copied
+        view = memoryview(data)
+        while view:
+            written = os.write(out_fd, view)
+            view = view[written:]
+        copied += len(data)
+
+
+def _fsync_dir(dir_path: Path) -> None:
+    """ディレクトリを fsync して、rename の結果を永続化する（非対応の環境では何もしない）"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _PendingCommit:
+    """GroupCommitter に登録された1件の書き込み"""
+    
+    def __init__(self, fd: int, tmp_path: Path, final_path: Path):
+        self.fd = fd
+        self.tmp_path = tmp_path
+        self.final_path = final_path
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommitter:
+    """
+    複数スレッドからのアトミック書き込みの fsync をまとめるクラス
+    
+    最初に commit() を呼んだスレッドがリーダーとなり、max_delay 秒だけ
+    他の書き込みの合流を待ってから、まとめて以下を行います。
+    
+    1. 各一時ファイルを fsync
+    2. 一時ファイルを最終的なパスに rename
+    3. 関係するディレクトリを、ディレクトリごとに1回だけ fsync
+    
+    他のスレッドはリーダーの処理が終わるまで待ちます。リーダーは自分の書き込みを
+    含むバッチだけを処理して戻り、その間に登録された書き込みは、待機中の
+    スレッドの1つが次のリーダーとなって処理します。
+    """
+    
+    def __init__(self, max_delay: float = DEFAULT_GROUP_COMMIT_DELAY):
+        """
+        初期化
+        
+        Args:
+            max_delay: リーダーが他の書き込みを待つ時間（秒）
+        """
+        self.max_delay = max_delay
+        self.commits = 0
+        self.batches = 0
+        self._pending: List[_PendingCommit] = []
+        self._leader_active = False
+        self._cond = threading.Condition()
+    
+    def commit(self, fd: int, tmp_path: Path, final_path: Path) -> None:
+        """
+        一時ファイルを永続化して、最終的なパスに rename する
+        
+        Args:
+            fd: 書き込み済みの一時ファイルのファイルディスクリプタ
+            tmp_path: 一時ファイルのパス
+            final_path: 最終的なファイルパス
+        """
+        entry = _PendingCommit(fd, tmp_path, final_path)
+        with self._cond:
+            self._pending.append(entry)
+            while self._leader_active and not entry.done:
+                self._cond.wait()
+            if not entry.done:
+                self._leader_active = True
+        
+        if not entry.done:
+            self._lead()
+        
+        if entry.error is not None:
+            raise entry.error
+    
+    def _lead(self) -> None:
+        """リーダーとして、自分の書き込みを含む1バッチを処理し、リーダーを譲る"""
+        if self.max_delay > 0:
+            time.sleep(self.max_delay)
+        
+        with self._cond:
+            batch = self._pending
+            self._pending = []
+        
+        try:
+            self._run_batch(batch)
+        finally:
+            with self._cond:
+                self.commits += len(batch)
+                self.batches += 1
+                for entry in batch:
+                    entry.done = True
+                # 待機中のスレッドのうち、書き込みが未完了のものが次のリーダーになる
+                self._leader_active = False
+                self._cond.notify_all()
+    
+    def _run_batch(self, batch: List[_PendingCommit]) -> None:
+        """1バッチ分の fsync と rename を実行し、エラーは各書き込みに記録する"""
+        renamed: Dict[Path, List[_PendingCommit]] = {}
+        for entry in batch:
+            try:
+                os.fsync(entry.fd)
+                os.replace(entry.tmp_path, entry.final_path)
+            except OSError as e:
+                entry.error = e
+                continue
+            renamed.setdefault(entry.final_path.parent, []).append(entry)
+        
+        for dir_path, entries in renamed.items():
+            try:
+                _fsync_dir(dir_path)
+            except OSError as e:
+                for entry in entries:
+                    entry.error = e
+
+
+class FileContentCache:
+    """
+    ファイル内容のLRUキャッシュ
+    
+    エントリは stat() の mtime_ns とサイズで検証し、どちらかが変わっていれば
+    無効とみなします。容量は保持している内容の UTF-8 でのバイト数の合計で
+    制限し（圧縮ファイルでは、ディスク上のサイズではなく展開後のサイズ）、
+    上限を超えた場合は最も古く使われたエントリから削除します。
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_SIZE):
+        """
+        初期化
+        
+        Args:
+            max_bytes: キャッシュに保持する内容の合計上限（バイト）
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # キー: ファイルパス、値: (mtime_ns, size, 内容のバイト数, 内容)
+        self._entries: "OrderedDict[str, Tuple[int, int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, file_path: str, stat_result: os.stat_result) -> Optional[str]:
+        """
+        キャッシュから内容を取得する
+        
+        Args:
+            file_path: ファイルパス
+            stat_result: 現在のファイルの stat 結果
+            
+        Returns:
+            キャッシュされた内容（ないか、古い場合はNone）
+        """
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None:
+                mtime_ns, size, _, content = entry
+                if mtime_ns == stat_result.st_mtime_ns and size == stat_result.st_size:
+                    self._entries.move_to_end(file_path)
+                    self.hits += 1
+                    return content
+                self._remove(file_path)
+            self.misses += 1
+            return None
+    
+    def put(self, file_path: str, stat_result: os.stat_result, content: str) -> None:
+        """
+        キャッシュに内容を保存する
+        
+        Args:
+            file_path: ファイルパス
+            stat_result: 内容を読み込む前に取得した stat 結果
+            content: ファイルの内容
+        """
+        # ASCII のみの場合は文字数がそのままバイト数になるため、エンコードを省略する
+        charge = len(content) if content.isascii() else len(content.encode("utf-8"))
+        with self._lock:
+            self._remove(file_path)
+            # 上限より大きい内容はキャッシュしない
+            if charge > self.max_bytes:
+                return
+            self._entries[file_path] = (
+                stat_result.st_mtime_ns, stat_result.st_size, charge, content
+            )
+            self.current_bytes += charge
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_charge, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_charge
+                self.evictions += 1
+    
+    def invalidate(self, file_path: str) -> None:
+        """
+        指定したファイルのエントリを削除する
+        
+        Args:
+            file_path: ファイルパス
+        """
+        with self._lock:
+            self._remove(file_path)
+    
+    def clear(self) -> None:
+        """すべてのエントリを削除する"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def _remove(self, file_path: str) -> None:
+        """エントリを削除する（ロック取得済みで呼ぶこと）"""
+        entry = self._entries.pop(file_path, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+
+class DirectoryIndex:
+    """
+    ディレクトリのファイル一覧のキャッシュ
+    
+    ディレクトリごとにファイル名の一覧を読み込んでおき、存在確認を
+    メモリ上の集合の検索で済ませます。ディレクトリが存在しないことも
+    キャッシュします（ネガティブキャッシュ）。
+    
+    一覧は ttl 秒経過すると読み直します（ポーリング方式）。FileService を経由した
+    書き込みでは、該当するディレクトリが自動的に無効化されます。一覧の読み込み中に
+    無効化された場合は、読み込んだ一覧は古い可能性があるため保存しません。
+    なお、リンク先のない壊れたシンボリックリンクも「存在する」とみなされます。
+    """
+    
+    def __init__(
+        self,
+        ttl: float = DEFAULT_DIR_INDEX_TTL,
+        max_dirs: int = DEFAULT_DIR_INDEX_MAX_DIRS
+    ):
+        """
+        初期化
+        
+        Args:
+            ttl: ファイル一覧の有効期間（秒）
+            max_dirs: 保持するディレクトリ数の上限（超えた場合は古いものから削除）
+        """
+        self.ttl = ttl
+        self.max_dirs = max_dirs
+        self.hits = 0
+        self.misses = 0
+        # キー: ディレクトリパス、値: (読み込んだ時刻, ファイル名の集合。ディレクトリがなければNone)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[frozenset]]]" = OrderedDict()
+        # キー: ディレクトリパス、値: 無効化された回数（読み込み中の無効化の検出用）
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def exists(self, file_path: str) -> bool:
+        """
+        ファイルが存在するか確認
+        
+        Args:
+            file_path: ファイルパス
+            
+        Returns:
+            存在する場合はTrue
+        """
+        path = Path(file_path)
+        if path.name in ("", ".."):
+            # ルートディレクトリや ".." で終わるパスなど、親ディレクトリの一覧で判定できないパス
+            return path.exists()
+        
+        names = self._listing(str(path.parent))
+        return names is not None and path.name in names
+    
+    def invalidate(self, dir_path: str) -> None:
+        """
+        ディレクトリのファイル一覧を破棄する
+        
+        Args:
+            dir_path: ディレクトリパス
+        """
+        with self._lock:
+            self._entries.pop(dir_path, None)
+            if dir_path in self._generations:
+                self._generations[dir_path] += 1
+    
+    def clear(self) -> None:
+        """すべてのファイル一覧を破棄する"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+    
+    def _listing(self, dir_path: str) -> Optional[frozenset]:
+        """ファイル一覧を返す（期限切れの場合は読み直す）"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(dir_path)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(dir_path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.setdefault(dir_path, 0)
+        
+        try:
+            with os.scandir(dir_path) as it:
+                names: Optional[frozenset] = frozenset(e.name for e in it)
+        except (FileNotFoundError, NotADirectoryError):
+            names = None
+        
+        with self._lock:
+            # 読み込み中に無効化された場合、この一覧は古い可能性があるため保存しない
+            if self._generations.get(dir_path) != generation:
+                return names
+            self._entries[dir_path] = (now, names)
+            self._entries.move_to_end(dir_path)
+            while len(self._entries) > self.max_dirs:
+                evicted, _ = self._entries.popitem(last=False)
+                self._generations.pop(evicted, None)
+        return names
 
 
 class FileService:
     """ファイル操作サービスクラス"""
     
+    def __init__(
+        self,
+        cache: Optional[FileContentCache] = None,
+        atomic_writes: bool = False,
+        group_commit: Optional[GroupCommitter] = None,
+        compression: Optional[str] = None,
+        dir_index: Optional[DirectoryIndex] = None
+    ):
+        """
+        初期化
+        
+        Args:
+            cache: read_file で使用するキャッシュ（None の場合はキャッシュしない）
+            atomic_writes: write_file を一時ファイル + rename で行い、fsync で永続化する場合はTrue
+            group_commit: アトミック書き込みの fsync をまとめる GroupCommitter
+                （None の場合は書き込みごとに fsync する）
+            compression: 圧縮形式。"gzip" / "lzma" / "bz2" で固定、"auto" で拡張子から判定
+                （None の場合は圧縮しない）
+            dir_index: file_exists で使用するディレクトリ一覧のキャッシュ
+                （None の場合は毎回 Path.exists() で確認する）
+        """
+        if compression not in (None, "auto") and compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        
+        self.cache = cache
+        self.atomic_writes = atomic_writes
+        self.group_commit = group_commit
+        self.compression = compression
+        self.dir_index = dir_index
+    
+    def _invalidate(self, file_path: str) -> None:
+        """書き込んだファイルについて、キャッシュとディレクトリ一覧を無効化する"""
+        if self.cache is not None:
+            self.cache.invalidate(file_path)
+        if self.dir_index is not None:
+            self.dir_index.invalidate(str(Path(file_path).parent))
+    
+    def _make_parents(self, path: Path) -> None:
+        """
+        親ディレクトリを作成する
+        
+        新しく作成したディレクトリと、その親ディレクトリの一覧も無効化します。
+        """
+        if self.dir_index is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        
+        missing = []
+        dir_path = path.parent
+        while not dir_path.exists() and dir_path != dir_path.parent:
+            missing.append(dir_path)
+            dir_path = dir_path.parent
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for dir_path in missing:
+            self.dir_index.invalidate(str(dir_path))
+            self.dir_index.invalidate(str(dir_path.parent))
+    
+    def _codec(self, path: Path):
+        """パスに対応する圧縮モジュールを返す（圧縮しない場合はNone）"""
+        if self.compression is None:
+            return None
+        if self.compression == "auto":
+            name = COMPRESSION_EXTENSIONS.get(path.suffix.lower())
+            return COMPRESSION_CODECS[name] if name else None
+        return COMPRESSION_CODECS[self.compression]
+    
+    def _open_text(self, path: Path, mode: str) -> IO[str]:
+        """必要に応じて圧縮・展開しながら、テキストモードでファイルを開く"""
+        codec = self._codec(path)
+        if codec is not None:
+            return codec.open(path, mode + "t", encoding="utf-8")
+        return path.open(mode, encoding="utf-8")
+    
+    def _read_text(self, path: Path) -> str:
+        """ファイル全体をテキストとして読み込む"""
+        if self._codec(path) is None:
+            return path.read_text(encoding="utf-8")
+        with self._open_text(path, "r") as f:
+            return f.read()
+    
     def read_file(self, file_path: str) -> str:
         """
         ファイルを読み込む
@@ -21,10 +526,261 @@ class FileService:
         """
         path = Path(file_path)
         
+        if self.cache is not None:
+            return self._read_file_cached(path, file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        return self._read_text(path)
+    
+    def _read_file_cached(self, path: Path, file_path: str) -> str:
+        """stat() で検証しながら、キャッシュ経由でファイルを読み込む"""
+        try:
+            stat_result = path.stat()
+        except FileNotFoundError:
+            self.cache.invalidate(file_path)
+            raise FileNotFoundError(f"File not found: {file_path}") from None
+        
+        content = self.cache.get(file_path, stat_result)
+        if content is None:
+            content = self._read_text(path)
+            self.cache.put(file_path, stat_result, content)
+        return content
+    
+    def read_bytes(self, file_path: str) -> bytes:
+        """
+        ファイルをデコードせずにバイト列として読み込む
+        
+        Args:
+            file_path: ファイルパス
+            
+        Returns:
+            ファイルの内容（バイト列）
+        """
+        path = Path(file_path)
+        
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        return path.read_text(encoding="utf-8")
+        return path.read_bytes()
+    
+    @contextmanager
+    def map_file(self, file_path: str) -> Iterator[memoryview]:
+        """
+        ファイルをメモリマップして、読み取り専用の memoryview を返す
+        
+        ファイルの内容をコピー・デコードせずに、検索やスライスができます。
+        memoryview は with ブロックの中でのみ有効です。
+        
+        with ブロックの外までスライス（view[a:b]）を保持していると、その間は
+        メモリマップを閉じられません。この場合はエラーにせず、閉じる処理を
+        スライスがすべて解放されるまで（ガベージコレクションされるまで）遅らせます。
+        スライスを長く保持したい場合は bytes(view[a:b]) でコピーしてください。
+        
+        Usage:
+            with file_service.map_file("big.log") as view:
+                header = bytes(view[:16])
+        
+        Args:
+            file_path: ファイルパス
+            
+        Yields:
+            ファイル全体を指す memoryview
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        with path.open("rb") as f:
+            # 空のファイルはメモリマップできないため、空の memoryview を返す
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+                try:
+                    mapped.close()
+                except BufferError:
+                    # スライスがまだ参照しているため、最後のスライスが解放されたときに
+                    # mmap オブジェクトごと破棄される
+                    pass
+    
+    def iter_chunks(self, file_path: str, size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """
+        ファイルをチャンク単位で読み込む（ジェネレータ）
+        
+        ファイル全体をメモリに載せずに、最大 size バイトずつ読み込んで
+        デコードした文字列を返します。インクリメンタルデコーダを使うため、
+        チャンク境界でマルチバイト文字が分断されることはありません。
+        圧縮ファイルの場合、size は展開後のバイト数です。
+        
+        Args:
+            file_path: ファイルパス
+            size: 1回に読み込むバイト数
+            
+        Yields:
+            デコード済みのチャンク
+        """
+        if size <= 0:
+            raise ValueError(f"size must be positive: {size}")
+        
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        codec = self._codec(path)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with (codec.open(path, "rb") if codec is not None else path.open("rb")) as f:
+            while True:
+                data = f.read(size)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+        # 末尾に不完全なバイト列が残っていれば、ここで UnicodeDecodeError になる
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+    
+    def iter_lines(self, file_path: str) -> Iterator[str]:
+        """
+        ファイルを1行ずつ読み込む（ジェネレータ）
+        
+        Args:
+            file_path: ファイルパス
+            
+        Yields:
+            改行文字を含む各行
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        with self._open_text(path, "r") as f:
+            yield from f
+    
+    def read_since(
+        self,
+        file_path: str,
+        offset: int = 0,
+        inode: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> dict:
+        """
+        前回読み込んだ位置以降に追記された内容だけを読み込む
+        
+        inode が変わっている場合（ローテーション）や、ファイルが offset より
+        小さくなっている場合（切り詰め）は、先頭から読み直します。
+        末尾のマルチバイト文字が書き込み途中の場合は、その手前までを返します。
+        
+        Args:
+            file_path: ファイルパス
+            offset: 前回の読み込み終了位置（バイト）
+            inode: 前回読み込んだファイルの inode（None の場合は検証しない）
+            max_bytes: 1回に読み込む最大バイト数（None の場合は制限なし）
+            
+        Returns:
+            読み込み結果
+            {
+                "content": "新しく追記された内容",
+                "offset": 次回に渡す位置,
+                "inode": 次回に渡す inode,
+                "reset": 先頭から読み直した場合はTrue
+            }
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        with path.open("rb") as f:
+            stat_result = os.fstat(f.fileno())
+            reset = (
+                (inode is not None and inode != stat_result.st_ino)
+                or stat_result.st_size < offset
+            )
+            if reset:
+                offset = 0
+            
+            f.seek(offset)
+            data = f.read(-1 if max_bytes is None else max_bytes)
+        
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        content = decoder.decode(data)
+        pending, _ = decoder.getstate()
+        
+        return {
+            "content": content,
+            "offset": offset + len(data) - len(pending),
+            "inode": stat_result.st_ino,
+            "reset": reset
+        }
+    
+    def follow(
+        self,
+        file_path: str,
+        state_path: Optional[str] = None,
+        poll_interval: float = 1.0
+    ) -> Iterator[str]:
+        """
+        ファイルに追記された内容を待ち続けて返す（tail -f 相当のジェネレータ）
+        
+        state_path を指定すると、読み込み位置を JSON として保存し、
+        再起動後はその位置から再開します。位置は呼び出し側が次の値を
+        要求した時点で保存するため、処理中に停止した内容は再度返されます。
+        保存は一時ファイルへの書き込みと rename で行うため、保存中に停止しても
+        位置のファイルが壊れることはありません。
+        
+        Args:
+            file_path: ファイルパス
+            state_path: 読み込み位置を保存するファイルパス（None の場合は保存しない）
+            poll_interval: 新しい内容がない場合に待つ時間（秒）
+            
+        Yields:
+            新しく追記された内容
+        """
+        offset = 0
+        inode = None
+        # 位置のファイルは圧縮せず、常にアトミックに書き込む
+        state_writer = FileService(atomic_writes=True, group_commit=self.group_commit)
+        if state_path is not None and Path(state_path).exists():
+            state = json.loads(Path(state_path).read_text(encoding="utf-8"))
+            offset = state["offset"]
+            inode = state["inode"]
+        
+        while True:
+            try:
+                result = self.read_since(
+                    file_path, offset, inode, max_bytes=DEFAULT_CHUNK_SIZE * 16
+                )
+            except FileNotFoundError:
+                # ローテーション直後で、新しいファイルがまだ作られていない
+                time.sleep(poll_interval)
+                continue
+            
+            offset = result["offset"]
+            inode = result["inode"]
+            if not result["content"]:
+                time.sleep(poll_interval)
+                continue
+            
+            yield result["content"]
+            
+            if state_path is not None:
+                state_writer.write_file(
+                    state_path, json.dumps({"offset": offset, "inode": inode})
+                )
+                self._invalidate(state_path)
     
     def write_file(self, file_path: str, content: str) -> None:
         """
@@ -35,8 +791,46 @@ class FileService:
             content: 書き込む内容
         """
         path = Path(file_path)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content, encoding="utf-8")
+        self._make_parents(path)
+        
+        if self.atomic_writes:
+            self._write_file_atomic(path, content)
+        elif self._codec(path) is not None:
+            with self._open_text(path, "w") as f:
+                f.write(content)
+        else:
+            path.write_text(content, encoding="utf-8")
+        
+        self._invalidate(file_path)
+    
+    def _write_file_atomic(self, path: Path, content: str) -> None:
+        """
+        一時ファイルに書き込んでから rename する
+        
+        途中でクラッシュしても、元のファイルか新しいファイルのどちらかが残り、
+        中途半端な内容のファイルにはなりません。
+        """
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        codec = self._codec(path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if codec is not None:
+                    # ファイルオブジェクトを渡した場合、圧縮側を閉じても f は閉じられない
+                    with codec.open(f, "wt", encoding="utf-8") as compressed:
+                        compressed.write(content)
+                else:
+                    f.write(content.encode("utf-8"))
+                f.flush()
+                if self.group_commit is not None:
+                    self.group_commit.commit(f.fileno(), tmp_path, path)
+                else:
+                    os.fsync(f.fileno())
+                    os.replace(tmp_path, path)
+                    _fsync_dir(path.parent)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
     
     def append_file(self, file_path: str, content: str) -> None:
         """
@@ -51,8 +845,148 @@ class FileService:
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        current_content = path.read_text(encoding="utf-8")
-        path.write_text(current_content + content, encoding="utf-8")
+        # 追記モードで開くため、既存の内容を読み直す必要はない（ファイルサイズに依存しない）
+        # 圧縮ファイルの場合は、新しい圧縮ストリームとして末尾に連結される
+        with self._open_text(path, "a") as f:
+            f.write(content)
+        
+        self._invalidate(file_path)
+    
+    def copy_file(self, src_path: str, dst_path: str) -> int:
+        """
+        ファイルをコピーする
+        
+        内容はデコードせずにバイト列のままコピーします（圧縮ファイルもそのままコピーされる）。
+        Linux では copy_file_range / sendfile を使い、カーネル内でコピーします。
+        コピー元とコピー先が同じファイルの場合は shutil.SameFileError を送出します。
+        
+        Args:
+            src_path: コピー元のファイルパス
+            dst_path: コピー先のファイルパス
+            
+        Returns:
+            コピーしたバイト数
+        """
+        src = Path(src_path)
+        dst = Path(dst_path)
+        
+        if not src.exists():
+            raise FileNotFoundError(f"File not found: {src_path}")
+        # コピー先を "wb" で開くと、同じファイルの場合は内容が失われる
+        if dst.exists() and os.path.samefile(src, dst):
+            raise shutil.SameFileError(f"{src_path} and {dst_path} are the same file")
+        
+        self._make_parents(dst)
+        with src.open("rb") as fsrc, dst.open("wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            copied = _copy_fd(fsrc.fileno(), fdst.fileno(), size)
+        
+        self._invalidate(dst_path)
+        return copied
+    
+    def move_file(self, src_path: str, dst_path: str) -> None:
+        """
+        ファイルを移動する
+        
+        同じファイルシステム内では rename のみで移動し、
+        異なるファイルシステム間では copy_file でコピーしてから元のファイルを削除します。
+        
+        Args:
+            src_path: 移動元のファイルパス
+            dst_path: 移動先のファイルパス
+        """
+        src = Path(src_path)
+        dst = Path(dst_path)
+        
+        if not src.exists():
+            raise FileNotFoundError(f"File not found: {src_path}")
+        
+        self._make_parents(dst)
+        try:
+            os.replace(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            self.copy_file(src_path, dst_path)
+            src.unlink()
+        
+        self._invalidate(src_path)
+        self._invalidate(dst_path)
+    
+    def delete_file(self, file_path: str) -> None:
+        """
+        ファイルを削除する
+        
+        Args:
+            file_path: ファイルパス
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        path.unlink()
+        self._invalidate(file_path)
+    
+    def read_many(
+        self,
+        file_paths: Iterable[str],
+        max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> List[dict]:
+        """
+        複数のファイルをスレッドプールで並列に読み込む
+        
+        1つのファイルでエラーが発生しても処理は中断せず、
+        そのファイルの結果にエラーを記録します。
+        
+        Args:
+            file_paths: ファイルパスのリスト
+            max_workers: 最大スレッド数
+            
+        Returns:
+            入力と同じ順序の結果のリスト
+            [
+                {"path": "a.txt", "content": "...", "error": None},
+                {"path": "b.txt", "content": None, "error": FileNotFoundError(...)}
+            ]
+        """
+        def _read(file_path: str) -> dict:
+            try:
+                return {"path": file_path, "content": self.read_file(file_path), "error": None}
+            except Exception as e:
+                return {"path": file_path, "content": None, "error": e}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_read, file_paths))
+    
+    def write_many(
+        self,
+        contents: Dict[str, str],
+        max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> List[dict]:
+        """
+        複数のファイルにスレッドプールで並列に書き込む
+        
+        Args:
+            contents: ファイルパスと書き込む内容の辞書
+            max_workers: 最大スレッド数
+            
+        Returns:
+            入力と同じ順序の結果のリスト
+            [
+                {"path": "a.txt", "error": None}
+            ]
+        """
+        def _write(item: Tuple[str, str]) -> dict:
+            file_path, content = item
+            try:
+                self.write_file(file_path, content)
+                return {"path": file_path, "error": None}
+            except Exception as e:
+                return {"path": file_path, "error": e}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_write, contents.items()))
     
     def file_exists(self, file_path: str) -> bool:
         """
@@ -64,5 +998,148 @@ class FileService:
         Returns:
             存在する場合はTrue
         """
+        if self.dir_index is not None:
+            return self.dir_index.exists(file_path)
         return Path(file_path).exists()
 
+
+
+class BufferedAppender:
+    """
+    小さな追記をまとめて書き込むクラス
+    
+    ファイルハンドルを開いたまま保持し、append() された内容をメモリ上に
+    ためておき、以下のタイミングでまとめて書き込みます。
+    
+    - ファイルごとのバッファが max_buffer_bytes に達したとき
+    - 前回のフラッシュから flush_interval 秒以上経過したとき
+      （バックグラウンドのスレッドが定期的に確認するため、append() が
+      呼ばれなくても、バッファの内容は flush_interval 秒程度で書き込まれる）
+    - flush() / close() を明示的に呼んだとき
+    
+    Usage:
+        with BufferedAppender(flush_interval=1.0) as appender:
+            appender.append("audit.log", "event\n")
+    """
+    
+    def __init__(
+        self,
+        max_buffer_bytes: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: Optional[float] = 1.0,
+        fsync: bool = False
+    ):
+        """
+        初期化
+        
+        Args:
+            max_buffer_bytes: ファイルごとのバッファ上限（バイト）
+            flush_interval: 時間によるフラッシュの間隔（秒）。None の場合は無効
+            fsync: フラッシュのたびに、ファイルごとに1回だけ fsync する場合はTrue
+        """
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._handles: Dict[str, BinaryIO] = {}
+        self._buffers: Dict[str, List[bytes]] = {}
+        self._buffered_bytes: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval is not None:
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="BufferedAppender-flusher", daemon=True
+            )
+            self._flusher.start()
+    
+    def append(self, file_path: str, content: str) -> None:
+        """
+        追記内容をバッファに追加する
+        
+        Args:
+            file_path: ファイルパス（append_file と同様に、既存のファイルである必要がある）
+            content: 追記する内容
+        """
+        data = content.encode("utf-8")
+        with self._lock:
+            if self._closed:
+                raise ValueError("BufferedAppender is closed")
+            
+            if file_path not in self._handles:
+                path = Path(file_path)
+                if not path.exists():
+                    raise FileNotFoundError(f"File not found: {file_path}")
+                self._handles[file_path] = path.open("ab")
+                self._buffers[file_path] = []
+                self._buffered_bytes[file_path] = 0
+            
+            self._buffers[file_path].append(data)
+            self._buffered_bytes[file_path] += len(data)
+            
+            if self._buffered_bytes[file_path] >= self.max_buffer_bytes:
+                self._flush_path(file_path)
+            
+            if (
+                self.flush_interval is not None
+                and time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_all()
+    
+    def flush(self) -> None:
+        """バッファの内容をすべてファイルに書き込む"""
+        with self._lock:
+            self._flush_all()
+    
+    def close(self) -> None:
+        """バックグラウンドのスレッドを止め、バッファを書き込み、保持しているファイルハンドルを閉じる"""
+        self._stop_flusher.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_all()
+            for handle in self._handles.values():
+                handle.close()
+            self._handles.clear()
+            self._buffers.clear()
+            self._buffered_bytes.clear()
+            self._closed = True
+    
+    def __enter__(self) -> "BufferedAppender":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _run_flusher(self) -> None:
+        """flush_interval ごとに、期限を過ぎたバッファを書き込む（バックグラウンドのスレッド）"""
+        while not self._stop_flusher.wait(self.flush_interval):
+            with self._lock:
+                if self._closed:
+                    return
+                if time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush_all()
+    
+    def _flush_all(self) -> None:
+        """すべてのファイルのバッファを書き込む（ロック取得済みで呼ぶこと）"""
+        for file_path in self._handles:
+            self._flush_path(file_path)
+        self._last_flush = time.monotonic()
+    
+    def _flush_path(self, file_path: str) -> None:
+        """1ファイル分のバッファを1回の write にまとめて書き込む"""
+        chunks = self._buffers[file_path]
+        if not chunks:
+            return
+        
+        handle = self._handles[file_path]
+        handle.write(b"".join(chunks))
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+        
+        chunks.clear()
+        self._buffered_bytes[file_path] = 0
@@ -0,0 +1,123 @@
+"""
+天気予報の集計
+複数の都市の天気予報を NumPy の配列に読み込み、ベクトル演算でまとめて集計します。
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from services.forecast_records import ForecastTable
+from services.weather_service import WeatherService
+
+
+def _group_stats(groups: np.ndarray, values: np.ndarray, size: int) -> dict:
+    """
+    グループごとの最小値・最大値・平均値を計算する（NaN は除外）
+    
+    値が1つもないグループは NaN になります。
+    """
+    valid = ~np.isnan(values)
+    groups = groups[valid]
+    values = values[valid].astype(np.float64)
+    
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=values, minlength=size)
+    minimums = np.full(size, np.inf)
+    maximums = np.full(size, -np.inf)
+    np.minimum.at(minimums, groups, values)
+    np.maximum.at(maximums, groups, values)
+    
+    empty = counts == 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    minimums[empty] = np.nan
+    maximums[empty] = np.nan
+    means[empty] = np.nan
+    return {"min": minimums, "max": maximums, "mean": means}
+
+
+def _histogram(groups: np.ndarray, codes: np.ndarray, size: int, num_codes: int) -> np.ndarray:
+    """グループごとの出現回数を (グループ数, コード数) の配列で返す"""
+    flat = np.bincount(groups * num_codes + codes, minlength=size * num_codes)
+    return flat.reshape(size, num_codes)
+
+
+def summarize_table(table: ForecastTable) -> dict:
+    """
+    ForecastTable を都市ごと・日ごとに集計する
+    
+    Args:
+        table: 集計する天気予報
+        
+    Returns:
+        {
+            "cities": ["Tokyo", ...],
+            "days": array([1, 2, 3]),
+            "conditions": ["Sunny", ...],
+            "per_city": {"min": array, "max": array, "mean": array,
+                         "condition_counts": array（都市数 × 天気の種類数）},
+            "per_day": {"min": array, "max": array, "mean": array,
+                        "condition_counts": array（日数 × 天気の種類数）}
+        }
+    """
+    # array の内容をコピーせずに NumPy の配列として扱う
+    temperatures = np.frombuffer(table.temperatures, dtype=np.float32)
+    city_codes = np.frombuffer(table.city_codes, dtype=np.uint16).astype(np.intp)
+    condition_codes = np.frombuffer(table.condition_codes, dtype=np.uint16).astype(np.intp)
+    day_values, day_codes = np.unique(
+        np.frombuffer(table.days, dtype=np.int32), return_inverse=True
+    )
+    
+    num_cities = len(table.city_names)
+    num_days = len(day_values)
+    num_conditions = len(table.condition_names)
+    
+    per_city = _group_stats(city_codes, temperatures, num_cities)
+    per_city["condition_counts"] = _histogram(
+        city_codes, condition_codes, num_cities, num_conditions
+    )
+    per_day = _group_stats(day_codes, temperatures, num_days)
+    per_day["condition_counts"] = _histogram(
+        day_codes, condition_codes, num_days, num_conditions
+    )
+    
+    return {
+        "cities": list(table.city_names),
+        "days": day_values,
+        "conditions": list(table.condition_names),
+        "per_city": per_city,
+        "per_day": per_day
+    }
+
+
+def aggregate_forecasts(
+    service: WeatherService,
+    cities: Iterable[str],
+    days: int = 3,
+    max_workers: Optional[int] = None
+) -> dict:
+    """
+    複数の都市の天気予報を取得して集計する
+    
+    取得は WeatherService.get_forecast_many で並列に行い、取得に失敗した都市は
+    集計から除外して errors に入れます。
+    
+    Args:
+        service: 天気サービス
+        cities: 都市名のリスト
+        days: 予報日数（デフォルト: 3日）
+        max_workers: 同時に実行するリクエスト数
+        
+    Returns:
+        summarize_table の結果に "errors": {都市名: 例外} を加えた辞書
+    """
+    fetched = service.get_forecast_many(cities, days=days, max_workers=max_workers)
+    
+    table = ForecastTable()
+    for city, forecast in fetched["results"].items():
+        table.extend(city, forecast)
+    
+    summary = summarize_table(table)
+    summary["errors"] = fetched["errors"]
+    return summary
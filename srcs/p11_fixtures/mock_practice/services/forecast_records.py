@@ -0,0 +1,172 @@
+"""
+天気予報のコンパクトな表現
+1日分の予報を辞書の代わりに __slots__ のレコードや、列ごとの配列で保持してメモリを節約します。
+"""
+
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+
+class ForecastDay:
+    """
+    1日分の天気予報（__slots__ によりインスタンスごとの __dict__ を持たない）
+    
+    day / temperature / condition 以外の項目は保持しません。
+    """
+    
+    __slots__ = ("day", "temperature", "condition")
+    
+    def __init__(self, day: int, temperature: Optional[float], condition: Optional[str]):
+        """
+        初期化
+        
+        Args:
+            day: 何日目か
+            temperature: 気温
+            condition: 天気（同じ文字列は sys.intern で共有する）
+        """
+        self.day = day
+        self.temperature = temperature
+        self.condition = sys.intern(condition) if condition is not None else None
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "ForecastDay":
+        """
+        API の予報の辞書から作成する
+        
+        Args:
+            data: {"day": 1, "temperature": 25, "condition": "Sunny"}
+            
+        Returns:
+            ForecastDay
+        """
+        return cls(data.get("day"), data.get("temperature"), data.get("condition"))
+    
+    def to_dict(self) -> dict:
+        """辞書に変換する"""
+        return {
+            "day": self.day,
+            "temperature": self.temperature,
+            "condition": self.condition
+        }
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ForecastDay):
+            return NotImplemented
+        return (self.day, self.temperature, self.condition) == (
+            other.day, other.temperature, other.condition
+        )
+    
+    def __repr__(self) -> str:
+        return (
+            f"ForecastDay(day={self.day!r}, temperature={self.temperature!r}, "
+            f"condition={self.condition!r})"
+        )
+
+
+class ForecastTable:
+    """
+    複数の都市・日の天気予報を列ごとの配列で保持するテーブル
+    
+    - city / condition: 文字列の一覧に登録し、各行はその番号（array('H')）だけを持つ
+    - day: array('i')
+    - temperature: array('f')（欠損値は NaN）
+    
+    行は必要になったときに ForecastDay や辞書に変換します。
+    
+    Usage:
+        table = ForecastTable()
+        table.extend("Tokyo", service.get_forecast("Tokyo"))
+        table[0]            # ForecastDay
+        table.city_of(0)    # "Tokyo"
+    """
+    
+    def __init__(self):
+        """初期化"""
+        self.days = array("i")
+        self.temperatures = array("f")
+        self.city_codes = array("H")
+        self.condition_codes = array("H")
+        self.city_names: List[str] = []
+        self.condition_names: List[Optional[str]] = []
+        self._city_index = {}
+        self._condition_index = {}
+    
+    @classmethod
+    def from_forecast(cls, city: str, forecast: Iterable[dict]) -> "ForecastTable":
+        """
+        1都市分の予報のリストから作成する
+        
+        Args:
+            city: 都市名
+            forecast: get_forecast が返す予報のリスト
+            
+        Returns:
+            ForecastTable
+        """
+        table = cls()
+        table.extend(city, forecast)
+        return table
+    
+    def extend(self, city: str, forecast: Iterable[dict]) -> None:
+        """
+        1都市分の予報を追加する
+        
+        Args:
+            city: 都市名
+            forecast: get_forecast が返す予報のリスト
+        """
+        city_code = self._code(city, self.city_names, self._city_index)
+        for item in forecast:
+            temperature = item.get("temperature")
+            self.days.append(item.get("day") or 0)
+            self.temperatures.append(float("nan") if temperature is None else temperature)
+            self.city_codes.append(city_code)
+            self.condition_codes.append(
+                self._code(item.get("condition"), self.condition_names, self._condition_index)
+            )
+    
+    def __len__(self) -> int:
+        return len(self.days)
+    
+    def __getitem__(self, index: int) -> ForecastDay:
+        """index 行目を ForecastDay に変換して返す"""
+        temperature = self.temperatures[index]
+        return ForecastDay(
+            self.days[index],
+            None if temperature != temperature else temperature,  # NaN を None に戻す
+            self.condition_names[self.condition_codes[index]]
+        )
+    
+    def __iter__(self) -> Iterator[ForecastDay]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def city_of(self, index: int) -> str:
+        """
+        index 行目の都市名を返す
+        
+        Args:
+            index: 行番号
+            
+        Returns:
+            都市名
+        """
+        return self.city_names[self.city_codes[index]]
+    
+    def to_dicts(self) -> List[dict]:
+        """すべての行を、get_forecast と同じ形の辞書のリストに変換する"""
+        return [row.to_dict() for row in self]
+    
+    @staticmethod
+    def _code(value, names: list, index: dict) -> int:
+        """文字列を一覧に登録し、その番号を返す"""
+        code = index.get(value)
+        if code is None:
+            code = len(names)
+            if code > 0xFFFF:
+                raise OverflowError("Too many distinct values for ForecastTable")
+            names.append(sys.intern(value) if isinstance(value, str) else value)
+            index[value] = code
+        return code
@@ -3,21 +3,886 @@
 外部APIを呼び出して天気情報を取得します。
 """
 
+import heapq
+import itertools
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from services.forecast_records import ForecastDay, ForecastTable
+
+
+# コネクションプールのデフォルトの大きさ
+DEFAULT_POOL_SIZE = 10
+
+# デフォルトのタイムアウト（接続, 読み込み）（秒）
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+# WeatherCache のエンドポイントごとのデフォルトの有効期間（秒）
+DEFAULT_CACHE_TTLS = {
+    "weather": 60.0,
+    "forecast": 600.0,
+}
+
+# 有効期間が切れた後も、裏で更新しながら古い値を返してよい期間（秒）
+DEFAULT_STALE_WHILE_REVALIDATE = 300.0
+
+# WeatherCache のデフォルトの最大エントリ数
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+# 条件付きリクエストのために保持する、予報の検証子の最大数
+DEFAULT_MAX_VALIDATORS = 1024
+
+# SQLiteWeatherStore のデフォルトの最大エントリ数と、保持する最大の経過時間（秒）
+DEFAULT_STORE_MAX_ENTRIES = 100_000
+DEFAULT_STORE_MAX_AGE = 24 * 60 * 60
+
+# SQLiteWeatherStore が、この回数の書き込みごとにコンパクションする
+STORE_COMPACT_INTERVAL = 1000
+
+# SQLiteWeatherStore が、ためておいた書き込みをまとめて保存する間隔（秒）
+DEFAULT_STORE_FLUSH_INTERVAL = 0.5
+
+# リトライのバックオフのデフォルト値（秒）
+DEFAULT_BACKOFF_BASE = 0.1
+DEFAULT_BACKOFF_MAX = 2.0
+
+# リトライ・サーキットブレーカーの対象とする HTTP ステータスコード
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# レート制限の優先度（小さいほど先に送る）
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+# キャッシュのキー: (エンドポイント, 都市名, 予報日数)
+CacheKey = Tuple[str, str, Optional[int]]
+
+
+class DeadlineExceeded(requests.Timeout):
+    """呼び出し全体の期限（リトライを含む）を過ぎた場合の例外"""
+
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが開いていて、リクエストを送らなかった場合の例外"""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    一時的なエラー（リトライする価値があるエラー）かどうかを判定する
+    
+    Args:
+        error: 発生した例外
+        
+    Returns:
+        接続エラー・タイムアウト・429/5xx の場合はTrue
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+def _cap_timeout(timeout, limit: float):
+    """requests のタイムアウト（数値またはタプル）を limit 秒以下に切り詰める"""
+    if timeout is None:
+        return limit
+    if isinstance(timeout, tuple):
+        return tuple(limit if t is None else min(t, limit) for t in timeout)
+    return min(timeout, limit)
+
+
+def shape_weather(data: dict) -> dict:
+    """
+    天気APIのレスポンスから、必要な項目だけを取り出す
+    
+    Args:
+        data: /weather のレスポンス
+        
+    Returns:
+        {"city": ..., "temperature": ..., "condition": ...}
+    """
+    return {
+        "city": data.get("city"),
+        "temperature": data.get("temperature"),
+        "condition": data.get("condition")
+    }
+
+
+def shape_forecast(data: dict) -> list:
+    """
+    天気予報APIのレスポンスから、予報のリストを取り出す
+    
+    Args:
+        data: /forecast のレスポンス
+        
+    Returns:
+        天気予報のリスト
+    """
+    return data.get("forecast", [])
+
+
+class SQLiteWeatherStore:
+    """
+    天気情報を SQLite に保存する永続キャッシュ
+    
+    WeatherCache に渡すと、保存されている値で起動時にキャッシュを温め、
+    以降は WeatherCache に保存した値を書き込みます。取得時刻は実時間（time.time()）で
+    保存するため、再起動をまたいでも有効期間の判定が続きます。
+    
+    save() はメモリ上にためるだけで、バックグラウンドのスレッドが flush_interval 秒ごとに
+    1つのトランザクションでまとめて書き込みます（ライトビハインド）。同じキーへの
+    書き込みは最後の値だけが保存されます。close() で残りを書き込んでから閉じます。
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        max_entries: int = DEFAULT_STORE_MAX_ENTRIES,
+        max_age: float = DEFAULT_STORE_MAX_AGE,
+        flush_interval: float = DEFAULT_STORE_FLUSH_INTERVAL
+    ):
+        """
+        初期化
+        
+        Args:
+            db_path: SQLite のデータベースファイルのパス
+            max_entries: 保持する最大エントリ数（超えた分は取得時刻の古いものから削除）
+            max_age: 保持する最大の経過時間（秒）
+            flush_interval: ためておいた書き込みを保存する間隔（秒）
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self._writes = 0
+        self._lock = threading.Lock()
+        # キー: CacheKey、値: (値, 取得時刻)
+        self._pending: Dict[CacheKey, Tuple[Any, float]] = {}
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS weather_cache (
+                    endpoint TEXT NOT NULL,
+                    city TEXT NOT NULL,
+                    days INTEGER NOT NULL,
+                    value TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (endpoint, city, days)
+                )
+                """
+            )
+        
+        self._stop_writer = threading.Event()
+        self._writer = threading.Thread(
+            target=self._run_writer, name="SQLiteWeatherStore-writer", daemon=True
+        )
+        self._writer.start()
+    
+    def load(self) -> List[Tuple[CacheKey, Any, float]]:
+        """
+        保存されているエントリを、取得時刻の新しい順に読み込む
+        
+        Returns:
+            (キー, 値, 取得してからの経過秒数) のリスト
+        """
+        self.flush()
+        self.compact()
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, city, days, value, fetched_at FROM weather_cache"
+                " ORDER BY fetched_at DESC"
+            ).fetchall()
+        
+        return [
+            ((endpoint, city, None if days < 0 else days), json.loads(value), now - fetched_at)
+            for endpoint, city, days, value, fetched_at in rows
+        ]
+    
+    def save(self, key: CacheKey, value: Any) -> None:
+        """
+        エントリを保存する（実際の書き込みはバックグラウンドで行う）
+        
+        Args:
+            key: キャッシュのキー
+            value: 値（JSON に変換できること。保存されるまで変更しないこと）
+        """
+        with self._pending_lock:
+            self._pending[key] = (value, time.time())
+    
+    def flush(self) -> None:
+        """ためておいた書き込みを、1つのトランザクションで保存する"""
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = {}
+        if not pending:
+            return
+        
+        rows = [
+            # 主キーに NULL は使えないため、予報日数なしは -1 として保存する
+            (endpoint, city, -1 if days is None else days, json.dumps(value), fetched_at)
+            for (endpoint, city, days), (value, fetched_at) in pending.items()
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO weather_cache VALUES (?, ?, ?, ?, ?)", rows
+                )
+            compact = (
+                self._writes // STORE_COMPACT_INTERVAL
+                != (self._writes + len(rows)) // STORE_COMPACT_INTERVAL
+            )
+            self._writes += len(rows)
+        if compact:
+            self.compact()
+    
+    def compact(self) -> None:
+        """古いエントリと、上限を超えたエントリを削除する"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM weather_cache WHERE fetched_at < ?",
+                    (time.time() - self.max_age,)
+                )
+                self._conn.execute(
+                    "DELETE FROM weather_cache WHERE rowid NOT IN ("
+                    " SELECT rowid FROM weather_cache ORDER BY fetched_at DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+    
+    def close(self) -> None:
+        """バックグラウンドのスレッドを止め、残りの書き込みを保存してからデータベースを閉じる"""
+        self._stop_writer.set()
+        self._writer.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.flush()
+        with self._lock:
+            self._conn.close()
+    
+    def _run_writer(self) -> None:
+        """flush_interval ごとに、ためておいた書き込みを保存する（バックグラウンドのスレッド）"""
+        while not self._stop_writer.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # 書き込めなかった分は破棄する（キャッシュなので、再取得すればよい）
+                pass
+
+
+class WeatherCache:
+    """
+    天気情報のキャッシュ
+    
+    (エンドポイント, 都市名, 予報日数) をキーとして、エンドポイントごとの有効期間で
+    レスポンスを保持します。エントリ数が上限を超えた場合は、最も古く使われたものから削除します。
+    
+    エントリの状態:
+    - fresh: 有効期間内。そのまま返す
+    - stale: 有効期間切れだが stale_while_revalidate 秒以内。古い値を返しつつ裏で更新する
+    - それ以外: キャッシュなしとして扱う
+    
+    返す値はキャッシュ内のオブジェクトそのものなので、呼び出し側で変更しないこと。
+    """
+    
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_while_revalidate: float = DEFAULT_STALE_WHILE_REVALIDATE,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        store: Optional[SQLiteWeatherStore] = None
+    ):
+        """
+        初期化
+        
+        Args:
+            ttls: エンドポイントごとの有効期間（秒）。指定しないエンドポイントはデフォルト値
+            stale_while_revalidate: 有効期間切れの値を返してよい期間（秒）
+            max_entries: 最大エントリ数
+            store: 永続キャッシュ（None の場合はメモリ上のみ）。
+                指定した場合、保存されている値でキャッシュを温める
+        """
+        self.ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # キー: CacheKey、値: (取得した時刻, 値)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.store = store
+        if store is not None:
+            self._warm(store)
+    
+    def _warm(self, store: SQLiteWeatherStore) -> None:
+        """永続キャッシュの値を、経過時間を引き継いで読み込む"""
+        now = time.monotonic()
+        # 新しい順に読み込まれるため、上限に達したら残りは古いものだけ
+        for key, value, age in store.load()[:self.max_entries]:
+            if key[0] not in self.ttls:
+                continue
+            self._entries[key] = (now - age, value)
+            # 新しいものほど「最近使われた」ことにする
+            self._entries.move_to_end(key, last=False)
+    
+    def lookup(self, key: CacheKey) -> Tuple[Any, Optional[str]]:
+        """
+        キャッシュから値を取得する
+        
+        Args:
+            key: キャッシュのキー
+            
+        Returns:
+            (値, 状態) のタプル。状態は "fresh" / "stale"、キャッシュがない場合は (None, None)
+        """
+        now = time.monotonic()
+        ttl = self.ttls[key[0]]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age < ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], "fresh"
+                if age < ttl + self.stale_while_revalidate:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    return entry[1], "stale"
+            self.misses += 1
+            return None, None
+    
+    def peek(self, key: CacheKey) -> Any:
+        """
+        有効期間に関係なく、保持している値を返す（障害時のフォールバック用）
+        
+        Args:
+            key: キャッシュのキー
+            
+        Returns:
+            保持している値（ない場合はNone）
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+    
+    def put(self, key: CacheKey, value: Any) -> None:
+        """
+        キャッシュに値を保存する
+        
+        Args:
+            key: キャッシュのキー
+            value: 値
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        
+        if self.store is not None:
+            self.store.save(key, value)
+    
+    def clear(self) -> None:
+        """すべてのエントリを削除する"""
+        with self._lock:
+            self._entries.clear()
+    
+    def close(self) -> None:
+        """永続キャッシュを閉じる（ためておいた書き込みも保存される）"""
+        if self.store is not None:
+            self.store.close()
+
+
+class CircuitBreaker:
+    """
+    サーキットブレーカー
+    
+    直近 window_size 回のリクエストのうち、失敗の割合が failure_rate 以上になったら
+    「開いた」状態になり、reset_timeout 秒の間はリクエストを送らずに失敗させます。
+    その後は1回だけ試し（半開き）、成功すれば閉じ、失敗すれば再び開きます。
+    """
+    
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0
+    ):
+        """
+        初期化
+        
+        Args:
+            failure_rate: 開く条件となる失敗の割合
+            window_size: 失敗の割合を計算する直近のリクエスト数
+            min_calls: 判定に必要な最小のリクエスト数
+            reset_timeout: 開いてから、試しにリクエストを送るまでの時間（秒）
+        """
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._results: deque = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def before_call(self) -> None:
+        """リクエストを送ってよいか確認する（送れない場合は CircuitOpenError）"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit breaker is open")
+                self.state = "half_open"
+            # 半開きの間は、試しのリクエストを1つだけ通す
+            if self._probing:
+                raise CircuitOpenError("Circuit breaker is half-open")
+            self._probing = True
+    
+    def record_success(self) -> None:
+        """リクエストの成功を記録する"""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "closed"
+                self._results.clear()
+                self._probing = False
+            self._results.append(True)
+    
+    def record_failure(self) -> None:
+        """リクエストの失敗を記録する"""
+        with self._lock:
+            if self.state == "half_open":
+                self._open()
+                return
+            self._results.append(False)
+            failures = self._results.count(False)
+            if (
+                len(self._results) >= self.min_calls
+                and failures / len(self._results) >= self.failure_rate
+            ):
+                self._open()
+    
+    def _open(self) -> None:
+        """開いた状態にする（ロック取得済みで呼ぶこと）"""
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self._results.clear()
+
+
+class HedgingPolicy:
+    """
+    ヘッジリクエストの設定と統計
+    
+    リクエストが delay 秒（quantile を指定した場合は、観測したレイテンシの分位点）以内に
+    返らなければ、同じリクエストをもう1つ送り、先に返ったほうを使います。
+    追加で送るリクエストは、全リクエスト数の budget の割合までに制限します。
+    """
+    
+    def __init__(
+        self,
+        delay: float = 0.1,
+        quantile: Optional[float] = None,
+        budget: float = 0.05,
+        window_size: int = 1000,
+        min_samples: int = 20
+    ):
+        """
+        初期化
+        
+        Args:
+            delay: ヘッジリクエストを送るまでの待ち時間（秒）
+            quantile: 指定した場合、観測したレイテンシのこの分位点（例: 0.95）を待ち時間にする。
+                サンプルが min_samples に満たない間は delay を使う
+            budget: ヘッジリクエストを送ってよい、全リクエスト数に対する割合
+            window_size: 分位点の計算に使う直近のレイテンシの数
+            min_samples: 分位点を使い始めるのに必要なサンプル数
+        """
+        self.delay = delay
+        self.quantile = quantile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._latencies: deque = deque(maxlen=window_size)
+        # 記録したサンプルの総数（window_size を超えても増え続ける）
+        self._samples = 0
+        self._cached_delay: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def hedge_delay(self) -> float:
+        """ヘッジリクエストを送るまでの待ち時間（秒）"""
+        with self._lock:
+            if self.quantile is None or len(self._latencies) < self.min_samples:
+                return self.delay
+            if self._cached_delay is None:
+                ordered = sorted(self._latencies)
+                index = min(int(len(ordered) * self.quantile), len(ordered) - 1)
+                self._cached_delay = ordered[index]
+            return self._cached_delay
+    
+    def record_request(self) -> None:
+        """リクエストを1つ送ったことを記録する"""
+        with self._lock:
+            self.requests += 1
+    
+    def record_latency(self, seconds: float) -> None:
+        """レスポンスまでにかかった時間を記録する"""
+        with self._lock:
+            self._latencies.append(seconds)
+            self._samples += 1
+            # 分位点は一定数のサンプルごとに計算し直す
+            # （ウィンドウが埋まると長さは変わらないため、総数で判定する）
+            if self._samples % 50 == 0:
+                self._cached_delay = None
+    
+    def record_win(self) -> None:
+        """ヘッジリクエストのほうが先に返ったことを記録する"""
+        with self._lock:
+            self.hedges_won += 1
+    
+    def try_acquire(self) -> bool:
+        """予算内であれば、ヘッジリクエストを1つ送る権利を得る"""
+        with self._lock:
+            if self.hedges_sent + 1 > self.budget * self.requests:
+                return False
+            self.hedges_sent += 1
+            return True
+
+
+def _close_response(future: Future) -> None:
+    """使われなかったレスポンスを閉じて、コネクションをプールに返す"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class RateLimiter:
+    """
+    優先度付きのトークンバケット
+    
+    1秒あたり rate 個のトークンが補充され、最大 burst 個までためられます。
+    リクエスト1回につきトークンを1個使い、トークンがなければ待ちます。
+    待っているリクエストは優先度の小さい順（同じ優先度なら到着順）にトークンを受け取ります。
+    """
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        初期化
+        
+        Args:
+            rate: 1秒あたりに補充されるトークン数
+            burst: ためられるトークンの上限（None の場合は rate と同じ）
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._waiters: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+    
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """
+        トークンを1個取得する（なければ待つ）
+        
+        Args:
+            priority: 優先度（小さいほど先にトークンを受け取る）
+            timeout: 待つ時間の上限（秒）。None の場合は無制限
+            
+        Returns:
+            取得できた場合はTrue、timeout までに取得できなかった場合はFalse
+        """
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            me = (priority, next(self._counter))
+            heapq.heappush(self._waiters, me)
+            # 新しく先頭になった場合に備えて、待っている他のスレッドに判定し直させる
+            self._cond.notify_all()
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == me and self._tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1
+                        self._cond.notify_all()
+                        return True
+                    
+                    # 先頭なら次のトークンが補充されるまで、そうでなければ通知があるまで待つ
+                    wait_for = (1 - self._tokens) / self.rate if self._waiters[0] == me else None
+                    if give_up_at is not None:
+                        remaining = give_up_at - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                    self._cond.wait(wait_for)
+            finally:
+                if me in self._waiters:
+                    self._waiters.remove(me)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+    
+    def try_acquire(self) -> bool:
+        """
+        待っているリクエストがなく、トークンがあればすぐに1個取得する
+        
+        Returns:
+            取得できた場合はTrue
+        """
+        with self._cond:
+            self._refill()
+            if self._waiters or self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+    
+    def _refill(self) -> None:
+        """経過時間に応じてトークンを補充する（ロック取得済みで呼ぶこと）"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+# API キーごとに共有する RateLimiter
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(api_key: str, rate: float, burst: Optional[float] = None) -> RateLimiter:
+    """
+    API キーごとに共有される RateLimiter を取得する
+    
+    同じ API キーで最初に作成されたときの rate / burst が使われます。
+    
+    Args:
+        api_key: 天気APIのキー
+        rate: 1秒あたりのリクエスト数
+        burst: 連続して送れるリクエスト数の上限
+        
+    Returns:
+        API キーに対応する RateLimiter
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(api_key)
+        if limiter is None:
+            limiter = RateLimiter(rate, burst)
+            _rate_limiters[api_key] = limiter
+        return limiter
+
+
+class _Call:
+    """SingleFlight で実行中の1件の呼び出し"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    同じキーの同時呼び出しを1回にまとめるクラス
+    
+    あるキーの呼び出しが実行中に、同じキーで do() が呼ばれた場合は、
+    新たに実行せずに実行中の呼び出しの完了を待ち、その結果（または例外）を共有します。
+    """
+    
+    def __init__(self):
+        """初期化"""
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Any, _Call] = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """
+        fn を実行する（同じキーの呼び出しが実行中なら、その結果を待つ）
+        
+        Args:
+            key: 呼び出しを識別するキー
+            fn: 実行する関数
+            
+        Returns:
+            fn の戻り値
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._in_flight[key] = call
+                self.calls += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+                call.done.set()
+        
+        if call.error is not None:
+            raise call.error
+        return call.result
 
 
 class WeatherService:
     """天気情報を取得するサービスクラス"""
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        timeout=DEFAULT_TIMEOUT,
+        cache: Optional[WeatherCache] = None,
+        coalesce_requests: bool = True,
+        max_retries: int = 0,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        deadline: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        rate_limit: Optional[float] = None,
+        rate_limit_burst: Optional[float] = None,
+        revalidate_forecasts: bool = False
+    ):
         """
         初期化
         
         Args:
             api_key: 天気APIのキー
+            pool_size: インスタンスごとに保持するコネクション数の上限
+            keep_alive: コネクションを再利用する場合はTrue
+            timeout: requests に渡すタイムアウト（秒、または (接続, 読み込み) のタプル）
+            cache: レスポンスのキャッシュ（None の場合はキャッシュしない）
+            coalesce_requests: 同じ内容の同時リクエストを1回の API 呼び出しにまとめる場合はTrue
+            max_retries: 一時的なエラー（接続エラー・タイムアウト・429/5xx）のリトライ回数
+            backoff_base: リトライ間隔の基準値（秒）。回数ごとに2倍にし、ジッターを加える
+            backoff_max: リトライ間隔の上限（秒）
+            deadline: 1回の呼び出し全体（リトライを含む）の期限（秒）。None の場合は期限なし
+            circuit_breaker: サーキットブレーカー（None の場合は使わない）。
+                開いている間、キャッシュがあれば最後に取得した値を返す
+            hedging: ヘッジリクエストの設定（None の場合は使わない）
+            rate_limit: API キーあたりの1秒間のリクエスト数の上限（None の場合は制限しない）。
+                同じ API キーのインスタンス間で共有され、get_weather が get_forecast より優先される
+            rate_limit_burst: 連続して送れるリクエスト数の上限（None の場合は rate_limit と同じ）
+            revalidate_forecasts: get_forecast で ETag / Last-Modified を使った条件付きリクエストを
+                送り、304 の場合は前回解析したリストを再利用する場合はTrue
         """
         self.api_key = api_key
         self.base_url = "https://api.weather.example.com"
+        self.timeout = timeout
+        self.cache = cache
+        self.pool_size = pool_size
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if coalesce_requests else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.circuit_breaker = circuit_breaker
+        self.hedging = hedging
+        self.revalidate_forecasts = revalidate_forecasts
+        self.not_modified_count = 0
+        # キー: (都市名, 予報日数)、値: {"etag", "last_modified", "value"}
+        self._validators: "OrderedDict[Tuple[str, int], dict]" = OrderedDict()
+        self._validators_lock = threading.Lock()
+        self.rate_limiter: Optional[RateLimiter] = (
+            get_shared_rate_limiter(api_key, rate_limit, rate_limit_burst)
+            if rate_limit is not None else None
+        )
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        
+        # stale なエントリを裏で更新するためのスレッドプール（最初に必要になったときに作成）
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing: Set[CacheKey] = set()
+        self._refresh_lock = threading.Lock()
+        
+        # インスタンスごとに Session を保持し、TCP/TLS のコネクションを再利用する
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        self._adapter = adapter
+    
+    def close(self) -> None:
+        """保持しているコネクション、内部のスレッドプール、キャッシュの永続化先を閉じる"""
+        with self._refresh_lock:
+            executors = [self._refresh_executor, self._hedge_executor]
+            self._refresh_executor = None
+            self._hedge_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            # 裏での更新が終わってから閉じる
+            self.cache.close()
+    
+    def __enter__(self) -> "WeatherService":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def get_connection_stats(self) -> dict:
+        """
+        コネクションの再利用状況を取得
+        
+        Returns:
+            {
+                "requests": 送信したリクエスト数,
+                "connections": 新しく確立したコネクション数,
+                "reused": コネクションを再利用したリクエスト数
+            }
+        """
+        num_requests = 0
+        num_connections = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            num_requests += pool.num_requests
+            num_connections += pool.num_connections
+        
+        return {
+            "requests": num_requests,
+            "connections": num_connections,
+            "reused": max(num_requests - num_connections, 0)
+        }
     
     def get_weather(self, city: str) -> dict:
         """
@@ -34,35 +899,50 @@ class WeatherService:
                 "condition": "Sunny"
             }
         """
+        return self._cached(("weather", city, None), lambda: self._fetch_weather(city))
+    
+    def _fetch_weather(self, city: str) -> dict:
+        """外部APIから天気情報を取得する"""
         url = f"{self.base_url}/weather"
         params = {
             "city": city,
             "api_key": self.api_key
         }
         
-        # 外部APIを呼び出し
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # エラーがあれば例外を発生
-        
-        data = response.json()
+        # 外部APIを呼び出し（エラーがあれば例外を発生）
+        response = self._get(url, params, PRIORITY_INTERACTIVE)
         
-        return {
-            "city": data.get("city"),
-            "temperature": data.get("temperature"),
-            "condition": data.get("condition")
-        }
+        return shape_weather(response.json())
     
-    def get_forecast(self, city: str, days: int = 3) -> list:
+    def get_forecast(self, city: str, days: int = 3, as_type: str = "dict"):
         """
         指定した都市の天気予報を取得
         
         Args:
             city: 都市名
             days: 予報日数（デフォルト: 3日）
+            as_type: 戻り値の形式
+                - "dict": 辞書のリスト（デフォルト）
+                - "records": ForecastDay のリスト
+                - "table": ForecastTable（列ごとの配列）
             
         Returns:
-            天気予報のリスト
+            天気予報のリスト（as_type に応じた形式）
         """
+        if as_type not in ("dict", "records", "table"):
+            raise ValueError(f"Unsupported as_type: {as_type}")
+        
+        forecast = self._cached(
+            ("forecast", city, days), lambda: self._fetch_forecast(city, days)
+        )
+        if as_type == "records":
+            return [ForecastDay.from_dict(item) for item in forecast]
+        if as_type == "table":
+            return ForecastTable.from_forecast(city, forecast)
+        return forecast
+    
+    def _fetch_forecast(self, city: str, days: int) -> list:
+        """外部APIから天気予報を取得する"""
         url = f"{self.base_url}/forecast"
         params = {
             "city": city,
@@ -70,8 +950,314 @@ class WeatherService:
             "api_key": self.api_key
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        key = (city, days)
+        headers = None
+        validator = self._get_validator(key) if self.revalidate_forecasts else None
+        if validator is not None:
+            headers = {}
+            if validator["etag"]:
+                headers["If-None-Match"] = validator["etag"]
+            if validator["last_modified"]:
+                headers["If-Modified-Since"] = validator["last_modified"]
+        
+        response = self._get(url, params, PRIORITY_BULK, headers=headers)
+        
+        if validator is not None and response.status_code == 304:
+            # 変更がないため、前回解析したリストをそのまま使う
+            with self._validators_lock:
+                self.not_modified_count += 1
+            return validator["value"]
+        
+        forecast = shape_forecast(response.json())
+        if self.revalidate_forecasts:
+            self._store_validator(key, response, forecast)
+        return forecast
+    
+    def _get_validator(self, key: Tuple[str, int]) -> Optional[dict]:
+        """保存している検証子を取得する"""
+        with self._validators_lock:
+            validator = self._validators.get(key)
+            if validator is not None:
+                self._validators.move_to_end(key)
+            return validator
+    
+    def _store_validator(self, key: Tuple[str, int], response: requests.Response, value: list) -> None:
+        """レスポンスの ETag / Last-Modified と、解析済みの値を保存する"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._validators_lock:
+            if not etag and not last_modified:
+                self._validators.pop(key, None)
+                return
+            self._validators[key] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "value": value
+            }
+            self._validators.move_to_end(key)
+            while len(self._validators) > DEFAULT_MAX_VALIDATORS:
+                self._validators.popitem(last=False)
+    
+    def _get(
+        self,
+        url: str,
+        params: dict,
+        priority: int = PRIORITY_INTERACTIVE,
+        headers: Optional[dict] = None
+    ) -> requests.Response:
+        """
+        GET リクエストを送り、エラーがあれば例外を発生させる
+        
+        一時的なエラーはジッター付きの指数バックオフでリトライします（GET は冪等なため）。
+        deadline を過ぎた場合は DeadlineExceeded、サーキットブレーカーが開いている場合は
+        CircuitOpenError を発生させます。レート制限が有効な場合は、送信ごとに
+        priority の優先度でトークンを待ちます。
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            timeout = self.timeout
+            if self.deadline is not None:
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise DeadlineExceeded(f"Deadline of {self.deadline}s exceeded: {url}")
+                timeout = _cap_timeout(timeout, remaining)
+            
+            # ブレーカーの半開きの試行を確保してからトークンを待つと、待っている間に期限切れに
+            # なった場合に試行中のまま残るため、先にトークンを取得する
+            if self.rate_limiter is not None:
+                wait_limit = remaining if self.deadline is not None else None
+                if not self.rate_limiter.acquire(priority, timeout=wait_limit):
+                    raise DeadlineExceeded(f"Deadline of {self.deadline}s exceeded: {url}")
+                if self.deadline is not None:
+                    # トークンを待った時間の分も、タイムアウトを切り詰める
+                    remaining = self.deadline - (time.monotonic() - started)
+                    if remaining <= 0:
+                        raise DeadlineExceeded(f"Deadline of {self.deadline}s exceeded: {url}")
+                    timeout = _cap_timeout(timeout, remaining)
+            
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_call()
+            
+            try:
+                response = self._send(url, params, timeout, headers)
+                response.raise_for_status()
+            except Exception as e:
+                transient = is_transient_error(e)
+                if self.circuit_breaker is not None:
+                    if transient:
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+                if not transient or attempt >= self.max_retries:
+                    raise
+            else:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_success()
+                return response
+            
+            # フルジッター: 0 〜 base * 2^attempt（上限 backoff_max）の間でランダムに待つ
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+            if self.deadline is not None:
+                delay = min(delay, max(self.deadline - (time.monotonic() - started), 0))
+            time.sleep(delay)
+            attempt += 1
+    
+    def _send(
+        self,
+        url: str,
+        params: dict,
+        timeout,
+        headers: Optional[dict] = None
+    ) -> requests.Response:
+        """
+        リクエストを1回送る（ヘッジが有効な場合は、遅ければもう1つ送る）
+        
+        先に成功したレスポンスを返します。requests では送信中のリクエストを
+        中断できないため、負けたほうは完了時にレスポンスを閉じて破棄します。
+        """
+        # 条件付きリクエストのときだけヘッダーを付ける
+        request_kwargs = {"params": params, "timeout": timeout}
+        if headers:
+            request_kwargs["headers"] = headers
+        
+        if self.hedging is None:
+            return self.session.get(url, **request_kwargs)
+        
+        policy = self.hedging
+        with self._refresh_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=self.pool_size * 2)
+            executor = self._hedge_executor
+        
+        policy.record_request()
+        started = time.monotonic()
+        primary = executor.submit(self.session.get, url, **request_kwargs)
+        try:
+            response = primary.result(timeout=policy.hedge_delay())
+        except FuturesTimeoutError:
+            pass
+        else:
+            policy.record_latency(time.monotonic() - started)
+            return response
+        
+        # ヘッジリクエストもレート制限の対象だが、待ってまでは送らない
+        if not policy.try_acquire() or (
+            self.rate_limiter is not None and not self.rate_limiter.try_acquire()
+        ):
+            response = primary.result()
+            policy.record_latency(time.monotonic() - started)
+            return response
+        
+        hedge = executor.submit(self.session.get, url, **request_kwargs)
+        pending = {primary, hedge}
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    first_error = first_error or future.exception()
+                    continue
+                
+                for loser in (done | pending) - {future}:
+                    if not loser.cancel():
+                        loser.add_done_callback(_close_response)
+                if future is hedge:
+                    policy.record_win()
+                policy.record_latency(time.monotonic() - started)
+                return future.result()
+        
+        raise first_error
+    
+    def get_weather_many(
+        self,
+        cities: Iterable[str],
+        max_workers: Optional[int] = None
+    ) -> dict:
+        """
+        複数の都市の天気情報を並列に取得
+        
+        一部の都市で失敗しても処理は中断せず、取得できた結果とエラーを分けて返します。
+        
+        Args:
+            cities: 都市名のリスト
+            max_workers: 同時に実行するリクエスト数（None の場合はコネクションプールの大きさ）
+            
+        Returns:
+            {
+                "results": {"Tokyo": {...天気情報...}},
+                "errors": {"Osaka": Exception(...)}
+            }
+        """
+        return self._fetch_many(self.get_weather, cities, max_workers)
+    
+    def get_forecast_many(
+        self,
+        cities: Iterable[str],
+        days: int = 3,
+        max_workers: Optional[int] = None
+    ) -> dict:
+        """
+        複数の都市の天気予報を並列に取得
+        
+        Args:
+            cities: 都市名のリスト
+            days: 予報日数（デフォルト: 3日）
+            max_workers: 同時に実行するリクエスト数（None の場合はコネクションプールの大きさ）
+            
+        Returns:
+            {
+                "results": {"Tokyo": [...天気予報...]},
+                "errors": {"Osaka": Exception(...)}
+            }
+        """
+        return self._fetch_many(
+            lambda city: self.get_forecast(city, days), cities, max_workers
+        )
+    
+    def _fetch_many(
+        self,
+        fetch: Callable[[str], Any],
+        cities: Iterable[str],
+        max_workers: Optional[int]
+    ) -> dict:
+        """都市ごとに fetch をスレッドプールで実行し、結果とエラーを分けて返す"""
+        # 重複を除きつつ、入力の順序を保つ
+        unique_cities = list(dict.fromkeys(cities))
+        results = {}
+        errors = {}
+        if not unique_cities:
+            return {"results": results, "errors": errors}
+        
+        workers = min(max_workers or self.pool_size, len(unique_cities))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {city: executor.submit(fetch, city) for city in unique_cities}
+            for city, future in futures.items():
+                try:
+                    results[city] = future.result()
+                except Exception as e:
+                    errors[city] = e
+        
+        return {"results": results, "errors": errors}
+    
+    def _cached(self, key: CacheKey, fetch: Callable[[], Any]) -> Any:
+        """
+        キャッシュを使って値を取得する
+        
+        fresh ならそのまま返し、stale なら古い値を返しつつ裏で更新し、
+        キャッシュがなければ fetch を呼び出して保存します。
+        同時に呼び出された場合、キャッシュへの保存は実際に fetch した1回だけです。
+        """
+        if self.cache is None:
+            load = fetch
+        else:
+            load = partial(self._fetch_and_store, key, fetch)
+        if self.single_flight is not None:
+            load = partial(self.single_flight.do, key, load)
+        
+        if self.cache is None:
+            return load()
+        
+        value, state = self.cache.lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            self._refresh_in_background(key, load)
+            return value
+        
+        try:
+            return load()
+        except CircuitOpenError:
+            # 障害中は、有効期間切れでも最後に取得した値があれば返す
+            value = self.cache.peek(key)
+            if value is None:
+                raise
+            return value
+    
+    def _fetch_and_store(self, key: CacheKey, fetch: Callable[[], Any]) -> Any:
+        """fetch を呼び出して、結果をキャッシュに保存する"""
+        value = fetch()
+        self.cache.put(key, value)
+        return value
+    
+    def _refresh_in_background(self, key: CacheKey, load: Callable[[], Any]) -> None:
+        """キャッシュを裏で更新する（同じキーの更新は同時に1つだけ）"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=4)
+        
+        def _refresh():
+            try:
+                load()
+            except Exception:
+                # 更新に失敗した場合は古い値を返し続け、次の stale ヒットで再試行する
+                pass
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
         
-        return response.json().get("forecast", [])
+        self._refresh_executor.submit(_refresh)
 
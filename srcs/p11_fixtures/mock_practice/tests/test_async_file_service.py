@@ -0,0 +1,71 @@
+"""
+非同期ファイルサービスのテスト
+内部の FileService をモック化してテストします。
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock
+from services.async_file_service import AsyncFileService
+from services.file_service import FileService
+
+
+@pytest.fixture
+def mock_file_service():
+    """FileService のモック"""
+    return Mock(spec=FileService)
+
+
+@pytest.fixture
+def async_file_service(mock_file_service):
+    """非同期ファイルサービスのフィクスチャ（終了時にスレッドプールを閉じる）"""
+    service = AsyncFileService(file_service=mock_file_service, max_concurrency=2)
+    yield service
+    service.close()
+
+
+def test_read_file(async_file_service, mock_file_service):
+    """非同期でファイルを読み込むテスト"""
+    mock_file_service.read_file.return_value = "Hello, World!"
+    
+    result = asyncio.run(async_file_service.read_file("test.txt"))
+    
+    assert result == "Hello, World!"
+    mock_file_service.read_file.assert_called_once_with("test.txt")
+
+
+def test_write_and_append_file(async_file_service, mock_file_service):
+    """非同期でファイルに書き込み・追記するテスト"""
+    async def _run():
+        await async_file_service.write_file("test.txt", "Hello")
+        await async_file_service.append_file("test.txt", ", World!")
+    
+    asyncio.run(_run())
+    
+    mock_file_service.write_file.assert_called_once_with("test.txt", "Hello")
+    mock_file_service.append_file.assert_called_once_with("test.txt", ", World!")
+
+
+def test_read_file_not_found(async_file_service, mock_file_service):
+    """FileService の例外がそのまま伝わることのテスト"""
+    mock_file_service.read_file.side_effect = FileNotFoundError("File not found: x.txt")
+    
+    with pytest.raises(FileNotFoundError, match="File not found"):
+        asyncio.run(async_file_service.read_file("x.txt"))
+
+
+def test_file_exists_with_real_file(tmp_path):
+    """実際の FileService と組み合わせたテスト"""
+    (tmp_path / "exists.txt").write_text("", encoding="utf-8")
+    service = AsyncFileService()
+    
+    async def _run():
+        return await asyncio.gather(
+            service.file_exists(str(tmp_path / "exists.txt")),
+            service.file_exists(str(tmp_path / "missing.txt")),
+        )
+    
+    try:
+        assert asyncio.run(_run()) == [True, False]
+    finally:
+        service.close()
@@ -0,0 +1,68 @@
+"""
+非同期天気サービスのテスト
+ローカルのスタブサーバーと、ClientSession のモックを使ってテストします。
+"""
+
+import asyncio
+import aiohttp
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.async_weather_service import AsyncWeatherService
+
+
+def test_get_weather(weather_stub_server):
+    """天気情報が WeatherService と同じ形で返されることのテスト"""
+    async def _run():
+        async with AsyncWeatherService(api_key="test_api_key") as service:
+            service.base_url = weather_stub_server.url
+            return await service.get_weather("Tokyo")
+    
+    result = asyncio.run(_run())
+    
+    assert result == {"city": "Tokyo", "temperature": 25, "condition": "Sunny"}
+
+
+def test_get_forecast_concurrent(weather_stub_server):
+    """並行して取得した場合も、結果が正しく返されることのテスト"""
+    async def _run():
+        async with AsyncWeatherService(api_key="test_api_key", max_concurrency=2) as service:
+            service.base_url = weather_stub_server.url
+            return await asyncio.gather(
+                *(service.get_forecast(city, days=2) for city in ["Tokyo", "Osaka", "Nagoya"])
+            )
+    
+    results = asyncio.run(_run())
+    
+    assert [len(r) for r in results] == [2, 2, 2]
+    assert weather_stub_server.request_count == 3
+
+
+def test_get_weather_api_error(weather_stub_server):
+    """エラーレスポンスの場合に例外が発生することのテスト"""
+    async def _run():
+        async with AsyncWeatherService(api_key="test_api_key") as service:
+            service.base_url = f"{weather_stub_server.url}/missing"
+            await service.get_weather("Tokyo")
+    
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(_run())
+
+
+def test_get_weather_params():
+    """クエリパラメータが正しく渡されることのテスト"""
+    mock_response = MagicMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.json = AsyncMock(return_value={"forecast": []})
+    mock_get = MagicMock()
+    mock_get.return_value.__aenter__ = AsyncMock(return_value=mock_response)
+    mock_get.return_value.__aexit__ = AsyncMock(return_value=False)
+    
+    async def _run():
+        async with AsyncWeatherService(api_key="test_api_key") as service:
+            with patch.object(aiohttp.ClientSession, "get", mock_get):
+                return await service.get_forecast("Tokyo", days=5)
+    
+    assert asyncio.run(_run()) == []
+    call_args = mock_get.call_args
+    assert call_args[0][0] == "https://api.weather.example.com/forecast"
+    assert call_args[1]["params"] == {"city": "Tokyo", "days": "5", "api_key": "test_api_key"}
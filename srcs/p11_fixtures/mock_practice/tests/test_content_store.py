@@ -0,0 +1,118 @@
+"""
+コンテンツアドレス型ストアのテスト
+tmp_path 上に実際にストアを作ってテストします。
+"""
+
+import pytest
+from unittest.mock import patch
+from services.content_store import ContentStore
+from services.file_service import DirectoryIndex, FileService
+
+
+@pytest.fixture
+def store(tmp_path):
+    """tmp_path をルートにしたストアのフィクスチャ"""
+    return ContentStore(str(tmp_path / "store"))
+
+
+def test_put_deduplicates(store):
+    """同じ内容は1回しか書き込まれないことのテスト"""
+    with patch.object(FileService, "write_file", wraps=store.file_service.write_file) as mock_write:
+        digest1 = store.put("payload")
+        digest2 = store.put("payload")
+    
+    assert digest1 == digest2 == ContentStore.digest("payload")
+    assert store.has(digest1)
+    assert store.get(digest1) == "payload"
+    mock_write.assert_called_once()
+
+
+def test_link_and_unlink_refcount(store):
+    """参照がなくなったときだけブロブが削除されることのテスト"""
+    digest = store.link("a.json", "same")
+    store.link("b.json", "same")
+    
+    assert store.read("a.json") == "same"
+    
+    store.unlink("a.json")
+    assert store.has(digest)
+    
+    store.unlink("b.json")
+    assert not store.has(digest)
+
+
+def test_link_replaces_previous_content(store):
+    """同じ名前で別の内容をリンクした場合、古いブロブが解放されることのテスト"""
+    old_digest = store.link("config", "v1")
+    store.link("config", "v2")
+    
+    assert store.read("config") == "v2"
+    assert not store.has(old_digest)
+
+
+def test_index_survives_restart(tmp_path):
+    """リンクと参照数が再起動後も保持されることのテスト"""
+    ContentStore(str(tmp_path / "store")).link("a.json", "payload")
+    
+    reopened = ContentStore(str(tmp_path / "store"))
+    
+    assert reopened.read("a.json") == "payload"
+    with pytest.raises(KeyError, match="Link not found"):
+        reopened.read("missing")
+
+
+def test_unlink_invalidates_dir_index(tmp_path):
+    """ブロブの削除が FileService のディレクトリ一覧のキャッシュに反映されることのテスト"""
+    file_service = FileService(atomic_writes=True, dir_index=DirectoryIndex(ttl=60))
+    store = ContentStore(str(tmp_path / "store"), file_service=file_service)
+    
+    digest = store.link("a.json", "payload")
+    assert store.has(digest)
+    
+    store.unlink("a.json")
+    assert not store.has(digest)
+    
+    # 同じ内容を再びリンクすると、ブロブが書き直される
+    store.link("b.json", "payload")
+    assert store.read("b.json") == "payload"
+
+
+def test_link_appends_to_log(tmp_path):
+    """リンクの変更ごとに、インデックス全体ではなく1行だけ追記されることのテスト"""
+    store = ContentStore(str(tmp_path / "store"))
+    log_path = tmp_path / "store" / "index.log"
+    
+    store.link("a.json", "v1")
+    store.link("b.json", "v2")
+    store.unlink("a.json")
+    
+    assert len(log_path.read_text(encoding="utf-8").splitlines()) == 3
+    
+    reopened = ContentStore(str(tmp_path / "store"))
+    assert reopened.read("b.json") == "v2"
+    with pytest.raises(KeyError, match="Link not found"):
+        reopened.read("a.json")
+
+
+def test_log_ignores_torn_last_line(tmp_path):
+    """追記中に停止した最後の1行は、再起動時に無視されることのテスト"""
+    ContentStore(str(tmp_path / "store")).link("a.json", "payload")
+    with open(tmp_path / "store" / "index.log", "a", encoding="utf-8") as f:
+        f.write('{"name": "b.js')
+    
+    reopened = ContentStore(str(tmp_path / "store"))
+    
+    assert reopened.read("a.json") == "payload"
+
+
+def test_log_compaction(tmp_path):
+    """ログが長くなったら、現在のリンクだけに圧縮されることのテスト"""
+    store = ContentStore(str(tmp_path / "store"))
+    log_path = tmp_path / "store" / "index.log"
+    
+    with patch("services.content_store.LOG_COMPACT_MIN_RECORDS", 4):
+        for i in range(5):
+            store.link("config", f"v{i}")
+    
+    assert len(log_path.read_text(encoding="utf-8").splitlines()) == 1
+    assert ContentStore(str(tmp_path / "store")).read("config") == "v4"
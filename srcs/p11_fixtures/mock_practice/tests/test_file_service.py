@@ -5,9 +5,22 @@
 全般的に、pathを丸々モック化して、必要なメソッドの戻り値を設定する。
 """
 
+import errno
+import gzip
+import os
+import shutil
+import threading
+import time
 import pytest
-from unittest.mock import Mock, patch, mock_open
-from services.file_service import FileService
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch, mock_open
+from services.file_service import (
+    BufferedAppender,
+    DirectoryIndex,
+    FileContentCache,
+    FileService,
+    GroupCommitter,
+)
 
 
 @pytest.fixture
@@ -74,18 +87,17 @@ def test_append_file(file_service):
     with patch("services.file_service.Path") as mock_path:
         mock_path_instance = Mock()
         mock_path_instance.exists.return_value = True
-        mock_path_instance.read_text.return_value = "Existing content"
-        mock_path_instance.write_text = Mock()
+        # open() をモック化（mock_open でファイルハンドルを模擬）
+        mock_path_instance.open = mock_open()
         mock_path.return_value = mock_path_instance
         
         # テスト実行
         file_service.append_file("test.txt", "\nNew content")
         
-        # ファイルが正しく追記されたことを確認
-        mock_path_instance.read_text.assert_called_once_with(encoding="utf-8")
-        mock_path_instance.write_text.assert_called_once_with(
-            "Existing content\nNew content", encoding="utf-8"
-        )
+        # 追記モードで開かれ、既存の内容は読み込まれていないことを確認
+        mock_path_instance.open.assert_called_once_with("a", encoding="utf-8")
+        mock_path_instance.open().write.assert_called_once_with("\nNew content")
+        mock_path_instance.read_text.assert_not_called()
 
 
 def test_append_file_not_found(file_service):
@@ -116,3 +128,624 @@ def test_file_exists(file_service):
         assert result is True
         mock_path_instance.exists.assert_called_once()
 
+
+
+def test_iter_chunks_keeps_multibyte_characters(file_service, tmp_path):
+    """チャンク境界でマルチバイト文字が分断されないことのテスト"""
+    # 実ファイルを tmp_path に作成（"あ" は UTF-8 で3バイト）
+    file_path = tmp_path / "multibyte.txt"
+    file_path.write_text("あいうえお" * 10, encoding="utf-8")
+    
+    # 2バイトずつ読み込んでも、文字が壊れずに復元できる
+    chunks = list(file_service.iter_chunks(str(file_path), size=2))
+    
+    assert "".join(chunks) == "あいうえお" * 10
+    assert all(chunks)
+
+
+def test_iter_chunks_not_found(file_service, tmp_path):
+    """チャンク読み込み対象のファイルが見つからない場合のテスト"""
+    with pytest.raises(FileNotFoundError, match="File not found"):
+        list(file_service.iter_chunks(str(tmp_path / "nonexistent.txt")))
+
+
+def test_iter_lines(file_service, tmp_path):
+    """1行ずつ読み込むテスト"""
+    file_path = tmp_path / "lines.txt"
+    file_path.write_text("line1\nline2\nline3", encoding="utf-8")
+    
+    result = list(file_service.iter_lines(str(file_path)))
+    
+    assert result == ["line1\n", "line2\n", "line3"]
+
+
+def test_buffered_appender_flush(tmp_path):
+    """BufferedAppender が flush() までは書き込まないことのテスト"""
+    file_path = tmp_path / "audit.log"
+    file_path.write_text("", encoding="utf-8")
+    
+    appender = BufferedAppender(flush_interval=None)
+    appender.append(str(file_path), "a\n")
+    appender.append(str(file_path), "b\n")
+    
+    # まだバッファ内にあるので、ファイルは空のまま
+    assert file_path.read_text(encoding="utf-8") == ""
+    
+    appender.flush()
+    assert file_path.read_text(encoding="utf-8") == "a\nb\n"
+    
+    appender.close()
+
+
+def test_buffered_appender_flush_on_size(tmp_path):
+    """バッファ上限に達したら自動的に書き込まれることのテスト"""
+    file_path = tmp_path / "audit.log"
+    file_path.write_text("", encoding="utf-8")
+    
+    with BufferedAppender(max_buffer_bytes=4, flush_interval=None) as appender:
+        appender.append(str(file_path), "ab")
+        assert file_path.read_text(encoding="utf-8") == ""
+        
+        appender.append(str(file_path), "cd")
+        assert file_path.read_text(encoding="utf-8") == "abcd"
+
+
+def test_buffered_appender_fsync_on_close(tmp_path):
+    """close() 時に書き込まれ、fsync がファイルごとに1回呼ばれることのテスト"""
+    file_path = tmp_path / "audit.log"
+    file_path.write_text("start\n", encoding="utf-8")
+    
+    with patch("services.file_service.os.fsync") as mock_fsync:
+        with BufferedAppender(flush_interval=None, fsync=True) as appender:
+            for i in range(3):
+                appender.append(str(file_path), f"{i}\n")
+        
+        mock_fsync.assert_called_once()
+    
+    assert file_path.read_text(encoding="utf-8") == "start\n0\n1\n2\n"
+
+
+def test_buffered_appender_flush_on_interval(tmp_path):
+    """append() が呼ばれなくても、flush_interval 後にバックグラウンドで書き込まれることのテスト"""
+    file_path = tmp_path / "audit.log"
+    file_path.write_text("", encoding="utf-8")
+    
+    with BufferedAppender(flush_interval=0.01) as appender:
+        appender.append(str(file_path), "event\n")
+        
+        deadline = time.monotonic() + 2.0
+        while file_path.read_text(encoding="utf-8") == "" and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert file_path.read_text(encoding="utf-8") == "event\n"
+    
+    # close() でバックグラウンドのスレッドが止まる
+    assert not appender._flusher.is_alive()
+
+
+def test_buffered_appender_not_found(tmp_path):
+    """追記対象のファイルが見つからない場合のテスト"""
+    with BufferedAppender() as appender:
+        with pytest.raises(FileNotFoundError, match="File not found"):
+            appender.append(str(tmp_path / "nonexistent.txt"), "content")
+
+
+def test_read_bytes(file_service, tmp_path):
+    """バイト列として読み込むテスト"""
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(b"\x00\x01binary")
+    
+    assert file_service.read_bytes(str(file_path)) == b"\x00\x01binary"
+
+
+def test_map_file(file_service, tmp_path):
+    """メモリマップした内容をスライス・検索できることのテスト"""
+    file_path = tmp_path / "big.log"
+    file_path.write_bytes(b"INFO start\nERROR failed\nINFO end\n")
+    
+    with file_service.map_file(str(file_path)) as view:
+        assert bytes(view[:4]) == b"INFO"
+        assert view.obj.find(b"ERROR") == 11
+
+
+def test_map_file_slice_outlives_block(file_service, tmp_path):
+    """with ブロックの外までスライスを保持しても、エラーにならないことのテスト"""
+    file_path = tmp_path / "big.log"
+    file_path.write_bytes(b"INFO start\nERROR failed\n")
+    
+    with file_service.map_file(str(file_path)) as view:
+        kept = view[11:16]
+    
+    # スライスは引き続き読み取れる
+    assert bytes(kept) == b"ERROR"
+    kept.release()
+
+
+def test_map_file_empty(file_service, tmp_path):
+    """空のファイルをメモリマップする場合のテスト"""
+    file_path = tmp_path / "empty.log"
+    file_path.write_bytes(b"")
+    
+    with file_service.map_file(str(file_path)) as view:
+        assert len(view) == 0
+
+
+def test_map_file_not_found(file_service, tmp_path):
+    """メモリマップ対象のファイルが見つからない場合のテスト"""
+    with pytest.raises(FileNotFoundError, match="File not found"):
+        with file_service.map_file(str(tmp_path / "nonexistent.log")):
+            pass
+
+
+def test_read_file_cached(tmp_path):
+    """キャッシュが有効な場合、2回目以降はディスクから読み込まないことのテスト"""
+    file_path = tmp_path / "config.txt"
+    file_path.write_text("value=1", encoding="utf-8")
+    
+    cache = FileContentCache()
+    file_service = FileService(cache=cache)
+    
+    assert file_service.read_file(str(file_path)) == "value=1"
+    
+    # 2回目は Path.read_text が呼ばれない
+    with patch.object(Path, "read_text") as mock_read_text:
+        assert file_service.read_file(str(file_path)) == "value=1"
+        mock_read_text.assert_not_called()
+    
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_read_file_cached_detects_change(tmp_path):
+    """ファイルが更新された場合、キャッシュが無効になることのテスト"""
+    file_path = tmp_path / "config.txt"
+    file_path.write_text("value=1", encoding="utf-8")
+    
+    cache = FileContentCache()
+    file_service = FileService(cache=cache)
+    file_service.read_file(str(file_path))
+    
+    # FileService を経由せずに更新（サイズが変わるので stat で検出できる）
+    file_path.write_text("value=100", encoding="utf-8")
+    
+    assert file_service.read_file(str(file_path)) == "value=100"
+    assert cache.misses == 2
+
+
+def test_file_content_cache_eviction(tmp_path):
+    """容量を超えた場合、最も古く使われたエントリが削除されることのテスト"""
+    paths = []
+    for name in ["a", "b", "c"]:
+        file_path = tmp_path / f"{name}.txt"
+        file_path.write_text(name * 10, encoding="utf-8")
+        paths.append(str(file_path))
+    
+    cache = FileContentCache(max_bytes=25)
+    file_service = FileService(cache=cache)
+    
+    file_service.read_file(paths[0])
+    file_service.read_file(paths[1])
+    file_service.read_file(paths[0])  # a を最近使ったことにする
+    file_service.read_file(paths[2])  # b が追い出される
+    
+    assert cache.evictions == 1
+    assert cache.current_bytes == 20
+    
+    file_service.read_file(paths[0])
+    assert cache.hits == 2
+
+
+def test_read_file_cache_charges_decompressed_size(tmp_path):
+    """圧縮ファイルは、ディスク上のサイズではなく展開後のサイズで容量を計算することのテスト"""
+    file_path = str(tmp_path / "data.txt.gz")
+    file_service = FileService(cache=FileContentCache(max_bytes=1000), compression="auto")
+    file_service.write_file(file_path, "x" * 2000)
+    
+    # 圧縮後は上限より小さいが、展開後は上限を超えるのでキャッシュしない
+    assert os.path.getsize(file_path) < 1000
+    assert file_service.read_file(file_path) == "x" * 2000
+    assert file_service.cache.current_bytes == 0
+    
+    file_service.write_file(file_path, "あ" * 100)
+    file_service.read_file(file_path)
+    assert file_service.cache.current_bytes == 300
+
+
+def test_read_many(file_service, tmp_path):
+    """複数ファイルの並列読み込みで、順序とエラーが保持されることのテスト"""
+    (tmp_path / "a.txt").write_text("A", encoding="utf-8")
+    (tmp_path / "c.txt").write_text("C", encoding="utf-8")
+    paths = [str(tmp_path / name) for name in ["a.txt", "b.txt", "c.txt"]]
+    
+    results = file_service.read_many(paths, max_workers=2)
+    
+    assert [r["path"] for r in results] == paths
+    assert results[0]["content"] == "A"
+    assert results[2]["content"] == "C"
+    # 存在しないファイルは例外を発生させずに、エラーとして記録される
+    assert results[1]["content"] is None
+    assert isinstance(results[1]["error"], FileNotFoundError)
+
+
+def test_write_many(file_service, tmp_path):
+    """複数ファイルの並列書き込みのテスト"""
+    contents = {
+        str(tmp_path / "x.txt"): "X",
+        str(tmp_path / "sub" / "y.txt"): "Y",
+    }
+    
+    results = file_service.write_many(contents)
+    
+    assert [r["path"] for r in results] == list(contents)
+    assert all(r["error"] is None for r in results)
+    assert (tmp_path / "sub" / "y.txt").read_text(encoding="utf-8") == "Y"
+
+
+def test_write_file_atomic(tmp_path):
+    """アトミック書き込みで、一時ファイルが残らないことのテスト"""
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("old", encoding="utf-8")
+    file_service = FileService(atomic_writes=True)
+    
+    file_service.write_file(str(file_path), "new")
+    
+    assert file_path.read_text(encoding="utf-8") == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.txt"]
+
+
+def test_write_file_atomic_failure_keeps_original(tmp_path):
+    """rename に失敗した場合、元のファイルが壊れないことのテスト"""
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("old", encoding="utf-8")
+    file_service = FileService(atomic_writes=True)
+    
+    with patch("services.file_service.os.replace", side_effect=OSError("disk error")):
+        with pytest.raises(OSError, match="disk error"):
+            file_service.write_file(str(file_path), "new")
+    
+    assert file_path.read_text(encoding="utf-8") == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.txt"]
+
+
+def test_write_file_group_commit(tmp_path):
+    """複数スレッドからの書き込みが、まとめてコミットされることのテスト"""
+    committer = GroupCommitter(max_delay=0.05)
+    file_service = FileService(atomic_writes=True, group_commit=committer)
+    barrier = threading.Barrier(8)
+    
+    def _write(i):
+        barrier.wait()
+        file_service.write_file(str(tmp_path / f"{i}.txt"), str(i))
+    
+    threads = [threading.Thread(target=_write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    for i in range(8):
+        assert (tmp_path / f"{i}.txt").read_text(encoding="utf-8") == str(i)
+    assert committer.commits == 8
+    assert committer.batches < 8
+
+
+def test_group_commit_leader_hands_off(tmp_path):
+    """リーダーは自分のバッチだけを処理し、後続のバッチは別のスレッドが処理することのテスト"""
+    committer = GroupCommitter(max_delay=0)
+    run_batch = committer._run_batch
+    leaders = []
+    
+    def _commit(name):
+        tmp_file = tmp_path / f"{name}.tmp"
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT)
+        try:
+            committer.commit(fd, tmp_file, tmp_path / f"{name}.txt")
+        finally:
+            os.close(fd)
+    
+    def _run_batch(batch):
+        leaders.append(threading.current_thread().name)
+        if len(leaders) == 1:
+            # 最初のバッチの処理中に、別のスレッドの書き込みを登録する
+            second.start()
+            deadline = time.monotonic() + 2.0
+            while not committer._pending and time.monotonic() < deadline:
+                time.sleep(0.001)
+            assert committer._pending
+        run_batch(batch)
+    
+    second = threading.Thread(target=_commit, args=("second",), name="second")
+    with patch.object(committer, "_run_batch", side_effect=_run_batch):
+        _commit("first")
+        second.join()
+    
+    assert leaders == [threading.current_thread().name, "second"]
+    assert (tmp_path / "first.txt").exists()
+    assert (tmp_path / "second.txt").exists()
+    assert committer.batches == 2
+
+
+@pytest.mark.parametrize("file_name", ["data.txt.gz", "data.txt.xz", "data.txt.bz2"])
+def test_compression_auto(tmp_path, file_name):
+    """拡張子から圧縮形式を判定して、透過的に読み書きできることのテスト"""
+    file_path = str(tmp_path / file_name)
+    file_service = FileService(compression="auto")
+    
+    file_service.write_file(file_path, "line1\n" * 100)
+    file_service.append_file(file_path, "line2\n")
+    
+    # ディスク上は圧縮されている
+    assert (tmp_path / file_name).stat().st_size < len("line1\n" * 100)
+    
+    assert file_service.read_file(file_path) == "line1\n" * 100 + "line2\n"
+    assert list(file_service.iter_lines(file_path))[-1] == "line2\n"
+    assert "".join(file_service.iter_chunks(file_path, size=7)) == "line1\n" * 100 + "line2\n"
+
+
+def test_compression_forced_with_atomic_write(tmp_path):
+    """圧縮形式を指定した場合、拡張子に関係なく圧縮されることのテスト"""
+    file_path = tmp_path / "data.txt"
+    file_service = FileService(atomic_writes=True, compression="gzip")
+    
+    file_service.write_file(str(file_path), "あいうえお")
+    
+    assert gzip.decompress(file_path.read_bytes()).decode("utf-8") == "あいうえお"
+    assert file_service.read_file(str(file_path)) == "あいうえお"
+
+
+def test_compression_unsupported():
+    """未対応の圧縮形式を指定した場合のテスト"""
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        FileService(compression="zip")
+
+
+def test_copy_file(file_service, tmp_path):
+    """ファイルコピーのテスト"""
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"\x00\xff" * 100_000)
+    
+    copied = file_service.copy_file(str(src), str(tmp_path / "out" / "dst.bin"))
+    
+    assert copied == 200_000
+    assert (tmp_path / "out" / "dst.bin").read_bytes() == src.read_bytes()
+
+
+def test_copy_file_fallback(file_service, tmp_path):
+    """カーネルのコピー機能が使えない場合、チャンク単位のコピーになることのテスト"""
+    src = tmp_path / "src.txt"
+    src.write_text("a" * 200_000, encoding="utf-8")
+    unsupported = OSError(errno.ENOSYS, "Function not implemented")
+    
+    with patch("services.file_service.os.copy_file_range", side_effect=unsupported, create=True), \
+            patch("services.file_service.os.sendfile", side_effect=unsupported, create=True):
+        copied = file_service.copy_file(str(src), str(tmp_path / "dst.txt"))
+    
+    assert copied == 200_000
+    assert (tmp_path / "dst.txt").read_text(encoding="utf-8") == "a" * 200_000
+
+
+def test_copy_file_not_found(file_service, tmp_path):
+    """コピー元のファイルが見つからない場合のテスト"""
+    with pytest.raises(FileNotFoundError, match="File not found"):
+        file_service.copy_file(str(tmp_path / "nonexistent.txt"), str(tmp_path / "dst.txt"))
+
+
+def test_copy_file_same_file(file_service, tmp_path):
+    """コピー元とコピー先が同じファイルの場合、内容を壊さずにエラーになることのテスト"""
+    src = tmp_path / "src.txt"
+    src.write_text("content", encoding="utf-8")
+    
+    with pytest.raises(shutil.SameFileError):
+        file_service.copy_file(str(src), str(tmp_path / "." / "src.txt"))
+    
+    assert src.read_text(encoding="utf-8") == "content"
+
+
+def test_move_file_across_filesystems(file_service, tmp_path):
+    """rename できない場合、コピーしてから削除されることのテスト"""
+    src = tmp_path / "src.txt"
+    src.write_text("content", encoding="utf-8")
+    
+    cross_device = OSError(errno.EXDEV, "Invalid cross-device link")
+    with patch("services.file_service.os.replace", side_effect=cross_device):
+        file_service.move_file(str(src), str(tmp_path / "dst.txt"))
+    
+    assert not src.exists()
+    assert (tmp_path / "dst.txt").read_text(encoding="utf-8") == "content"
+
+
+def test_delete_file_invalidates_dir_index(tmp_path):
+    """削除したファイルが、ディレクトリ一覧のキャッシュからも消えることのテスト"""
+    file_path = tmp_path / "a.txt"
+    file_path.write_text("", encoding="utf-8")
+    file_service = FileService(dir_index=DirectoryIndex(ttl=60))
+    assert file_service.file_exists(str(file_path)) is True
+    
+    file_service.delete_file(str(file_path))
+    
+    assert not file_path.exists()
+    assert file_service.file_exists(str(file_path)) is False
+    with pytest.raises(FileNotFoundError, match="File not found"):
+        file_service.delete_file(str(file_path))
+
+
+def test_read_since(file_service, tmp_path):
+    """前回の位置以降に追記された内容だけを読み込むテスト"""
+    file_path = tmp_path / "app.log"
+    file_path.write_text("line1\n", encoding="utf-8")
+    
+    first = file_service.read_since(str(file_path))
+    file_service.append_file(str(file_path), "line2\n")
+    second = file_service.read_since(str(file_path), first["offset"], first["inode"])
+    
+    assert first["content"] == "line1\n"
+    assert second["content"] == "line2\n"
+    assert second["reset"] is False
+
+
+def test_read_since_partial_multibyte(file_service, tmp_path):
+    """書き込み途中のマルチバイト文字は、次回に持ち越されることのテスト"""
+    file_path = tmp_path / "app.log"
+    encoded = "ログ".encode("utf-8")
+    file_path.write_bytes(encoded[:4])  # "ロ" + "グ" の途中まで
+    
+    first = file_service.read_since(str(file_path))
+    with file_path.open("ab") as f:
+        f.write(encoded[4:])
+    second = file_service.read_since(str(file_path), first["offset"], first["inode"])
+    
+    assert first["content"] == "ロ"
+    assert first["offset"] == 3
+    assert second["content"] == "グ"
+
+
+@pytest.mark.parametrize("rotate", ["truncate", "replace"])
+def test_read_since_detects_rotation(file_service, tmp_path, rotate):
+    """切り詰めやローテーションを検出して、先頭から読み直すことのテスト"""
+    file_path = tmp_path / "app.log"
+    file_path.write_text("old line\n", encoding="utf-8")
+    first = file_service.read_since(str(file_path))
+    
+    if rotate == "truncate":
+        file_path.write_text("new\n", encoding="utf-8")
+    else:
+        file_path.rename(tmp_path / "app.log.1")
+        file_path.write_text("new line\n", encoding="utf-8")
+    
+    second = file_service.read_since(str(file_path), first["offset"], first["inode"])
+    
+    assert second["reset"] is True
+    assert second["content"].startswith("new")
+
+
+def test_follow_resumes_from_saved_offset(file_service, tmp_path):
+    """保存した読み込み位置から再開できることのテスト"""
+    file_path = tmp_path / "app.log"
+    state_path = tmp_path / "app.log.offset"
+    file_path.write_text("line1\n", encoding="utf-8")
+    
+    follower = file_service.follow(str(file_path), str(state_path), poll_interval=0.01)
+    assert next(follower) == "line1\n"
+    file_service.append_file(str(file_path), "line2\n")
+    assert next(follower) == "line2\n"
+    follower.close()
+    
+    # 再起動後は、処理済みの line1 を読み直さない
+    file_service.append_file(str(file_path), "line3\n")
+    restarted = file_service.follow(str(file_path), str(state_path), poll_interval=0.01)
+    assert next(restarted) == "line2\nline3\n"
+    restarted.close()
+
+
+def test_follow_saves_offset_atomically(file_service, tmp_path):
+    """読み込み位置の保存に失敗しても、前回保存した位置が残ることのテスト"""
+    file_path = tmp_path / "app.log"
+    state_path = tmp_path / "app.log.offset"
+    file_path.write_text("line1\n", encoding="utf-8")
+    
+    follower = file_service.follow(str(file_path), str(state_path), poll_interval=0.01)
+    assert next(follower) == "line1\n"
+    file_service.append_file(str(file_path), "line2\n")
+    assert next(follower) == "line2\n"
+    saved = state_path.read_text(encoding="utf-8")
+    
+    file_service.append_file(str(file_path), "line3\n")
+    with patch("services.file_service.os.fsync", side_effect=OSError(errno.EIO, "I/O error")):
+        with pytest.raises(OSError):
+            next(follower)
+    
+    assert state_path.read_text(encoding="utf-8") == saved
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app.log", "app.log.offset"]
+
+
+def test_file_exists_with_dir_index(tmp_path):
+    """ディレクトリ一覧のキャッシュで存在確認するテスト"""
+    (tmp_path / "a.txt").write_text("", encoding="utf-8")
+    dir_index = DirectoryIndex(ttl=60)
+    file_service = FileService(dir_index=dir_index)
+    
+    with patch("services.file_service.os.scandir", wraps=os.scandir) as mock_scandir:
+        assert file_service.file_exists(str(tmp_path / "a.txt")) is True
+        assert file_service.file_exists(str(tmp_path / "b.txt")) is False
+        # 存在しないディレクトリもキャッシュされる
+        assert file_service.file_exists(str(tmp_path / "missing" / "c.txt")) is False
+        assert file_service.file_exists(str(tmp_path / "missing" / "d.txt")) is False
+        
+        # ディレクトリごとに1回だけ一覧を読み込む
+        assert mock_scandir.call_count == 2
+    
+    assert dir_index.hits == 2
+    assert dir_index.misses == 2
+
+
+def test_dir_index_invalidates_created_ancestors(tmp_path):
+    """write_file が作成した途中のディレクトリも、存在するとみなされることのテスト"""
+    file_service = FileService(dir_index=DirectoryIndex(ttl=60))
+    
+    # 存在しないことをキャッシュさせる
+    assert file_service.file_exists(str(tmp_path / "a")) is False
+    assert file_service.file_exists(str(tmp_path / "a" / "b")) is False
+    
+    file_service.write_file(str(tmp_path / "a" / "b" / "c.txt"), "content")
+    
+    assert file_service.file_exists(str(tmp_path / "a")) is True
+    assert file_service.file_exists(str(tmp_path / "a" / "b")) is True
+    assert file_service.file_exists(str(tmp_path / "a" / "b" / "c.txt")) is True
+
+
+def test_dir_index_parent_reference(tmp_path):
+    """".." で終わるパスは、ファイルシステムで直接確認することのテスト"""
+    (tmp_path / "sub").mkdir()
+    dir_index = DirectoryIndex(ttl=60)
+    
+    assert dir_index.exists(str(tmp_path / "sub" / "..")) is True
+    assert dir_index.exists(str(tmp_path / "missing" / "..")) is False
+
+
+def test_dir_index_discards_listing_invalidated_during_scan(tmp_path):
+    """一覧の読み込み中に無効化された場合、古い一覧を保存しないことのテスト"""
+    dir_index = DirectoryIndex(ttl=60)
+    file_path = tmp_path / "new.txt"
+    scandir = os.scandir
+    
+    def _scandir_then_write(dir_path):
+        # 一覧を読み込んだ直後に、別のスレッドがファイルを作成して無効化した状況
+        with scandir(dir_path) as it:
+            entries = list(it)
+        file_path.write_text("", encoding="utf-8")
+        dir_index.invalidate(str(tmp_path))
+        listing = MagicMock()
+        listing.__enter__.return_value = iter(entries)
+        return listing
+    
+    with patch("services.file_service.os.scandir", side_effect=_scandir_then_write):
+        assert dir_index.exists(str(file_path)) is False
+    
+    # 古い一覧はキャッシュされていないので、作成されたファイルを検出できる
+    assert dir_index.exists(str(file_path)) is True
+
+
+def test_dir_index_expires_after_ttl(tmp_path):
+    """有効期間が過ぎると、外部で作られたファイルを検出できることのテスト"""
+    dir_index = DirectoryIndex(ttl=1.0)
+    file_service = FileService(dir_index=dir_index)
+    file_path = str(tmp_path / "late.txt")
+    
+    with patch("services.file_service.time.monotonic", return_value=100.0):
+        assert file_service.file_exists(file_path) is False
+    
+    (tmp_path / "late.txt").write_text("", encoding="utf-8")
+    
+    with patch("services.file_service.time.monotonic", return_value=100.5):
+        assert file_service.file_exists(file_path) is False
+    with patch("services.file_service.time.monotonic", return_value=101.5):
+        assert file_service.file_exists(file_path) is True
+
+
+def test_dir_index_invalidated_by_write(tmp_path):
+    """FileService 経由で書き込んだファイルは、すぐに存在すると判定されることのテスト"""
+    file_service = FileService(dir_index=DirectoryIndex(ttl=60))
+    file_path = str(tmp_path / "new.txt")
+    
+    assert file_service.file_exists(file_path) is False
+    file_service.write_file(file_path, "content")
+    assert file_service.file_exists(file_path) is True
@@ -0,0 +1,62 @@
+"""
+天気予報の集計のテスト
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from services.forecast_analytics import aggregate_forecasts, summarize_table
+from services.forecast_records import ForecastTable
+from services.weather_service import WeatherService
+
+
+@pytest.fixture
+def forecast_table():
+    """2都市 × 2日分の天気予報のフィクスチャ"""
+    table = ForecastTable()
+    table.extend("Tokyo", [
+        {"day": 1, "temperature": 25, "condition": "Sunny"},
+        {"day": 2, "temperature": 21, "condition": "Rainy"},
+    ])
+    table.extend("Osaka", [
+        {"day": 1, "temperature": 27, "condition": "Sunny"},
+        {"day": 2, "temperature": None, "condition": "Sunny"},
+    ])
+    return table
+
+
+def test_summarize_per_city(forecast_table):
+    """都市ごとの集計のテスト（欠損値は除外される）"""
+    summary = summarize_table(forecast_table)
+    
+    assert summary["cities"] == ["Tokyo", "Osaka"]
+    np.testing.assert_allclose(summary["per_city"]["min"], [21, 27])
+    np.testing.assert_allclose(summary["per_city"]["max"], [25, 27])
+    np.testing.assert_allclose(summary["per_city"]["mean"], [23, 27])
+    assert summary["conditions"] == ["Sunny", "Rainy"]
+    assert summary["per_city"]["condition_counts"].tolist() == [[1, 1], [2, 0]]
+
+
+def test_summarize_per_day(forecast_table):
+    """日ごとの集計のテスト"""
+    summary = summarize_table(forecast_table)
+    
+    assert summary["days"].tolist() == [1, 2]
+    np.testing.assert_allclose(summary["per_day"]["mean"], [26, 21])
+    assert summary["per_day"]["condition_counts"].tolist() == [[2, 0], [1, 1]]
+
+
+def test_aggregate_forecasts_excludes_errors():
+    """取得に失敗した都市は、集計から除外されることのテスト"""
+    service = Mock(spec=WeatherService)
+    service.get_forecast_many.return_value = {
+        "results": {"Tokyo": [{"day": 1, "temperature": 20, "condition": "Sunny"}]},
+        "errors": {"Osaka": Exception("API Error")},
+    }
+    
+    summary = aggregate_forecasts(service, ["Tokyo", "Osaka"], days=1)
+    
+    assert summary["cities"] == ["Tokyo"]
+    np.testing.assert_allclose(summary["per_city"]["mean"], [20])
+    assert str(summary["errors"]["Osaka"]) == "API Error"
+    service.get_forecast_many.assert_called_once_with(["Tokyo", "Osaka"], days=1, max_workers=None)
@@ -0,0 +1,62 @@
+"""
+天気予報のコンパクトな表現のテスト
+"""
+
+import math
+import pytest
+from unittest.mock import patch
+from services.forecast_records import ForecastDay, ForecastTable
+from services.weather_service import WeatherService
+
+
+FORECAST = [
+    {"day": 1, "temperature": 25, "condition": "Sunny"},
+    {"day": 2, "temperature": None, "condition": "Cloudy"},
+    {"day": 3, "temperature": 22.5, "condition": "Sunny"},
+]
+
+
+def test_forecast_day_has_no_dict():
+    """ForecastDay が __dict__ を持たないことのテスト"""
+    record = ForecastDay.from_dict(FORECAST[0])
+    
+    assert not hasattr(record, "__dict__")
+    assert record.to_dict() == FORECAST[0]
+
+
+def test_forecast_table_columns():
+    """列ごとの配列に保持され、天気の文字列が共有されることのテスト"""
+    table = ForecastTable.from_forecast("Tokyo", FORECAST)
+    table.extend("Osaka", FORECAST[:1])
+    
+    assert len(table) == 4
+    assert table.temperatures.typecode == "f"
+    assert math.isnan(table.temperatures[1])
+    assert table.condition_names == ["Sunny", "Cloudy"]
+    assert list(table.condition_codes) == [0, 1, 0, 0]
+    assert table.city_of(3) == "Osaka"
+
+
+def test_forecast_table_lazy_conversion():
+    """行を取り出したときに ForecastDay や辞書に変換されることのテスト"""
+    table = ForecastTable.from_forecast("Tokyo", FORECAST)
+    
+    assert table[1] == ForecastDay(2, None, "Cloudy")
+    assert table.to_dicts() == FORECAST
+
+
+def test_get_forecast_as_type(mock_api_response_success):
+    """get_forecast で戻り値の形式を選べることのテスト"""
+    service = WeatherService(api_key="test_api_key")
+    
+    with patch("services.weather_service.requests.Session.get") as mock_get:
+        mock_get.return_value = mock_api_response_success({"forecast": FORECAST})
+        records = service.get_forecast("Tokyo", as_type="records")
+        table = service.get_forecast("Tokyo", as_type="table")
+    
+    assert records[2] == ForecastDay(3, 22.5, "Sunny")
+    assert isinstance(table, ForecastTable)
+    assert table.city_of(0) == "Tokyo"
+    
+    with pytest.raises(ValueError, match="Unsupported as_type"):
+        service.get_forecast("Tokyo", as_type="frame")
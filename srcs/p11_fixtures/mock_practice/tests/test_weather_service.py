@@ -3,9 +3,26 @@
 外部API呼び出しをモック化してテストします。
 """
 
+import sqlite3
+import threading
+import time
 import pytest
+import requests
+from contextlib import closing
 from unittest.mock import Mock, patch
-from services.weather_service import WeatherService
+from services.weather_service import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    HedgingPolicy,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    RateLimiter,
+    SingleFlight,
+    SQLiteWeatherStore,
+    WeatherCache,
+    WeatherService,
+)
 
 
 @pytest.fixture
@@ -21,15 +38,26 @@ def weather_service():
 @pytest.fixture
 def mock_requests_get():
     """
-    requests.get をモック化するフィクスチャ
-    patchを使用することで、requests.getをモック化して返す。
+    requests.Session.get をモック化するフィクスチャ
+    patchを使用することで、requests.Session.getをモック化して返す。
     （実際のサービスでは外部APIを呼び出して天気情報を取得するが、テストではモック化して天気情報を返す。）
-    with yieldを使用することで、モック化したrequests.getをテスト関数内で使用できる。
+    with yieldを使用することで、モック化したrequests.Session.getをテスト関数内で使用できる。
+    クラス属性をモックに置き換えるため、self は渡されず、第1引数は URL になる。
     """
-    with patch("services.weather_service.requests.get") as mock_get:
+    with patch("services.weather_service.requests.Session.get") as mock_get:
         yield mock_get
 
 
+def _wait_until(predicate, timeout=5.0):
+    """predicate が True になるまで待つ（タイムアウトした場合は False を返す）"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
 def test_get_weather_success(weather_service, mock_requests_get):
     """天気情報の取得が成功する場合のテスト"""
     # モックの戻り値を設定
@@ -97,3 +125,582 @@ def test_get_weather_api_error(weather_service, mock_requests_get):
     with pytest.raises(Exception, match="API Error"):
         weather_service.get_weather("Tokyo")
 
+
+
+def test_session_reuses_connections(weather_stub_server):
+    """同じインスタンスからのリクエストでコネクションが再利用されることのテスト"""
+    with WeatherService(api_key="test_api_key", pool_size=2) as service:
+        service.base_url = weather_stub_server.url
+        
+        for _ in range(5):
+            assert service.get_weather("Tokyo")["city"] == "Tokyo"
+        
+        stats = service.get_connection_stats()
+    
+    assert stats["requests"] == 5
+    assert stats["connections"] == 1
+    assert stats["reused"] == 4
+
+
+def test_timeout_is_passed(mock_requests_get, mock_api_response_success):
+    """設定したタイムアウトがリクエストに渡されることのテスト"""
+    mock_requests_get.return_value = mock_api_response_success({"forecast": []})
+    service = WeatherService(api_key="test_api_key", timeout=1.5)
+    
+    service.get_forecast("Tokyo")
+    
+    assert mock_requests_get.call_args[1]["timeout"] == 1.5
+
+
+def test_get_weather_cached(mock_requests_get, mock_api_response_success):
+    """有効期間内は API を呼ばずにキャッシュを返すことのテスト"""
+    mock_requests_get.return_value = mock_api_response_success(
+        {"city": "Tokyo", "temperature": 25, "condition": "Sunny"}
+    )
+    cache = WeatherCache()
+    service = WeatherService(api_key="test_api_key", cache=cache)
+    
+    first = service.get_weather("Tokyo")
+    second = service.get_weather("Tokyo")
+    
+    assert first == second
+    mock_requests_get.assert_called_once()
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_get_forecast_stale_while_revalidate(mock_requests_get, mock_api_response_success):
+    """有効期間切れの値を返しつつ、裏で更新されることのテスト"""
+    mock_requests_get.side_effect = [
+        mock_api_response_success({"forecast": [{"day": 1, "condition": "Sunny"}]}),
+        mock_api_response_success({"forecast": [{"day": 1, "condition": "Rainy"}]}),
+    ]
+    cache = WeatherCache(ttls={"forecast": 10}, stale_while_revalidate=60)
+    service = WeatherService(api_key="test_api_key", cache=cache)
+    
+    with patch("services.weather_service.time.monotonic", return_value=100.0):
+        service.get_forecast("Tokyo")
+    
+    with patch("services.weather_service.time.monotonic", return_value=120.0):
+        # 古い値がすぐに返される
+        assert service.get_forecast("Tokyo")[0]["condition"] == "Sunny"
+        # 裏での更新が終わるのを待つ
+        service.close()
+        assert service.get_forecast("Tokyo")[0]["condition"] == "Rainy"
+    
+    assert mock_requests_get.call_count == 2
+    assert cache.stale_hits == 1
+
+
+def test_weather_cache_expired_and_eviction():
+    """期限切れのエントリと、上限を超えたエントリが削除されることのテスト"""
+    cache = WeatherCache(ttls={"weather": 10}, stale_while_revalidate=5, max_entries=2)
+    
+    with patch("services.weather_service.time.monotonic", return_value=0.0):
+        cache.put(("weather", "Tokyo", None), {"city": "Tokyo"})
+        cache.put(("weather", "Osaka", None), {"city": "Osaka"})
+        cache.put(("weather", "Nagoya", None), {"city": "Nagoya"})
+    
+    assert cache.evictions == 1
+    with patch("services.weather_service.time.monotonic", return_value=1.0):
+        assert cache.lookup(("weather", "Tokyo", None)) == (None, None)
+        assert cache.lookup(("weather", "Osaka", None))[1] == "fresh"
+    with patch("services.weather_service.time.monotonic", return_value=16.0):
+        assert cache.lookup(("weather", "Nagoya", None)) == (None, None)
+
+
+def test_get_weather_many_partial_failure(weather_service, mock_requests_get,
+                                          mock_api_response_success, mock_api_response_error):
+    """一部の都市で失敗しても、他の都市の結果が返されることのテスト"""
+    def _response(url, params, **kwargs):
+        if params["city"] == "Osaka":
+            return mock_api_response_error(Exception("API Error"))
+        return mock_api_response_success(
+            {"city": params["city"], "temperature": 25, "condition": "Sunny"}
+        )
+    mock_requests_get.side_effect = _response
+    
+    result = weather_service.get_weather_many(["Tokyo", "Osaka", "Nagoya"], max_workers=3)
+    
+    assert list(result["results"]) == ["Tokyo", "Nagoya"]
+    assert result["results"]["Nagoya"]["city"] == "Nagoya"
+    assert str(result["errors"]["Osaka"]) == "API Error"
+    assert mock_requests_get.call_count == 3
+
+
+def test_get_forecast_many(weather_stub_server):
+    """複数の都市の天気予報を並列に取得するテスト"""
+    with WeatherService(api_key="test_api_key", pool_size=4) as service:
+        service.base_url = weather_stub_server.url
+        
+        result = service.get_forecast_many(["Tokyo", "Osaka", "Tokyo"], days=2)
+    
+    assert set(result["results"]) == {"Tokyo", "Osaka"}
+    assert len(result["results"]["Osaka"]) == 2
+    assert result["errors"] == {}
+    assert weather_stub_server.request_count == 2
+
+
+def test_concurrent_identical_requests_are_coalesced(weather_service, mock_requests_get,
+                                                     mock_api_response_success):
+    """同じ都市への同時リクエストが、1回の API 呼び出しにまとめられることのテスト"""
+    release = threading.Event()
+    
+    def _slow_response(url, params, **kwargs):
+        release.wait(timeout=5)
+        return mock_api_response_success(
+            {"city": params["city"], "temperature": 25, "condition": "Sunny"}
+        )
+    mock_requests_get.side_effect = _slow_response
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(weather_service.get_weather("Tokyo")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    # すべてのスレッドが待ち状態になるまで待ってから、レスポンスを返す
+    assert _wait_until(lambda: weather_service.single_flight.coalesced == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(results) == 5
+    assert all(r["city"] == "Tokyo" for r in results)
+    mock_requests_get.assert_called_once()
+    assert weather_service.single_flight.calls == 1
+
+
+def test_coalesced_requests_store_once(mock_requests_get, mock_api_response_success):
+    """同時リクエストをまとめた場合、キャッシュへの保存は1回だけであることのテスト"""
+    cache = WeatherCache()
+    service = WeatherService(api_key="test_api_key", cache=cache)
+    release = threading.Event()
+    
+    def _slow_response(url, params, **kwargs):
+        release.wait(timeout=5)
+        return mock_api_response_success(
+            {"city": params["city"], "temperature": 25, "condition": "Sunny"}
+        )
+    mock_requests_get.side_effect = _slow_response
+    
+    with patch.object(cache, "put", wraps=cache.put) as mock_put:
+        threads = [threading.Thread(target=service.get_weather, args=("Tokyo",)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        assert _wait_until(lambda: service.single_flight.coalesced == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+    
+    mock_put.assert_called_once()
+    service.close()
+
+
+def test_single_flight_shares_exception():
+    """実行中の呼び出しの例外が、待っていた呼び出しにも伝わることのテスト"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+    
+    def _failing():
+        started.set()
+        release.wait(timeout=5)
+        raise ValueError("upstream failed")
+    
+    def _call():
+        try:
+            flight.do("key", _failing)
+        except ValueError as e:
+            errors.append(e)
+    
+    leader = threading.Thread(target=_call)
+    leader.start()
+    started.wait(timeout=5)
+    follower = threading.Thread(target=_call)
+    follower.start()
+    assert _wait_until(lambda: flight.coalesced == 1)
+    release.set()
+    leader.join()
+    follower.join()
+    
+    assert len(errors) == 2
+    assert flight.calls == 1
+
+
+def _http_error(status_code):
+    """指定したステータスコードの requests.HTTPError を作成する"""
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} Error", response=response)
+
+
+@pytest.fixture
+def mock_sleep():
+    """リトライの待ち時間をなくすため、time.sleep をモック化するフィクスチャ"""
+    with patch("services.weather_service.time.sleep") as mock:
+        yield mock
+
+
+def test_get_weather_retries_transient_errors(mock_requests_get, mock_api_response_success,
+                                              mock_api_response_error, mock_sleep):
+    """一時的なエラーはリトライされることのテスト"""
+    mock_requests_get.side_effect = [
+        requests.ConnectionError("connection reset"),
+        mock_api_response_error(_http_error(503), status_code=503),
+        mock_api_response_success({"city": "Tokyo", "temperature": 25, "condition": "Sunny"}),
+    ]
+    service = WeatherService(api_key="test_api_key", max_retries=3)
+    
+    assert service.get_weather("Tokyo")["city"] == "Tokyo"
+    assert mock_requests_get.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_get_weather_does_not_retry_client_errors(mock_requests_get, mock_api_response_error,
+                                                  mock_sleep):
+    """404 などのエラーはリトライされないことのテスト"""
+    mock_requests_get.return_value = mock_api_response_error(_http_error(404), status_code=404)
+    service = WeatherService(api_key="test_api_key", max_retries=3)
+    
+    with pytest.raises(requests.HTTPError, match="404"):
+        service.get_weather("Tokyo")
+    mock_requests_get.assert_called_once()
+
+
+def test_get_weather_deadline(mock_requests_get, mock_sleep):
+    """期限を過ぎたらリトライを打ち切り、タイムアウトも期限内に切り詰められることのテスト"""
+    mock_requests_get.side_effect = requests.Timeout("read timeout")
+    service = WeatherService(api_key="test_api_key", max_retries=10, deadline=5.0)
+    
+    with patch("services.weather_service.time.monotonic", side_effect=[0.0, 0.0, 1.0, 1.0, 6.0, 6.0]):
+        with pytest.raises(DeadlineExceeded):
+            service.get_weather("Tokyo")
+    
+    assert mock_requests_get.call_count == 2
+    assert mock_requests_get.call_args_list[0][1]["timeout"] == (3.05, 5.0)
+
+
+def test_circuit_breaker_serves_last_cached_value(mock_requests_get, mock_api_response_success,
+                                                  mock_sleep):
+    """サーキットブレーカーが開いたら、API を呼ばずに最後の値を返すことのテスト"""
+    mock_requests_get.return_value = mock_api_response_success(
+        {"city": "Tokyo", "temperature": 25, "condition": "Sunny"}
+    )
+    breaker = CircuitBreaker(failure_rate=0.5, window_size=4, min_calls=2, reset_timeout=30)
+    service = WeatherService(
+        api_key="test_api_key",
+        cache=WeatherCache(ttls={"weather": 0}, stale_while_revalidate=0),
+        circuit_breaker=breaker
+    )
+    service.get_weather("Tokyo")
+    
+    # 直近2回のうち1回失敗（失敗率 0.5）で開く
+    mock_requests_get.side_effect = requests.ConnectionError("down")
+    with pytest.raises(requests.ConnectionError):
+        service.get_weather("Osaka")
+    assert breaker.state == "open"
+    
+    mock_requests_get.reset_mock()
+    assert service.get_weather("Tokyo")["city"] == "Tokyo"
+    with pytest.raises(CircuitOpenError):
+        service.get_weather("Osaka")
+    mock_requests_get.assert_not_called()
+
+
+def test_circuit_breaker_half_open_recovers():
+    """期間経過後の試しのリクエストが成功すれば、閉じることのテスト"""
+    breaker = CircuitBreaker(failure_rate=0.5, window_size=2, min_calls=1, reset_timeout=10)
+    
+    with patch("services.weather_service.time.monotonic", return_value=0.0):
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+    
+    with patch("services.weather_service.time.monotonic", return_value=11.0):
+        breaker.before_call()
+        # 試しのリクエスト中は、他のリクエストを通さない
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+    
+    assert breaker.state == "closed"
+
+
+def _slow_then_fast(mock_api_response_success, slow_seconds):
+    """1回目のリクエストだけ遅く返す side_effect を作成する"""
+    calls = []
+    lock = threading.Lock()
+    
+    def _response(url, params, **kwargs):
+        with lock:
+            calls.append(params["city"])
+            first = len(calls) == 1
+        if first:
+            time.sleep(slow_seconds)
+        return mock_api_response_success({"forecast": [{"day": 1, "slow": first}]})
+    return _response
+
+
+def test_get_forecast_hedged(mock_requests_get, mock_api_response_success):
+    """遅いリクエストの代わりに、ヘッジリクエストの結果が使われることのテスト"""
+    mock_requests_get.side_effect = _slow_then_fast(mock_api_response_success, 0.5)
+    hedging = HedgingPolicy(delay=0.01, budget=1.0)
+    
+    with WeatherService(api_key="test_api_key", hedging=hedging) as service:
+        started = time.monotonic()
+        result = service.get_forecast("Tokyo")
+        elapsed = time.monotonic() - started
+    
+    assert result == [{"day": 1, "slow": False}]
+    assert elapsed < 0.5
+    assert hedging.hedges_sent == 1
+    assert hedging.hedges_won == 1
+
+
+def test_hedging_budget(mock_requests_get, mock_api_response_success):
+    """予算を超える場合は、ヘッジリクエストを送らないことのテスト"""
+    mock_requests_get.side_effect = _slow_then_fast(mock_api_response_success, 0.05)
+    hedging = HedgingPolicy(delay=0.01, budget=0.5)
+    
+    with WeatherService(api_key="test_api_key", hedging=hedging) as service:
+        result = service.get_forecast("Tokyo")
+    
+    # 1リクエスト目では 0.5 件分の予算しかないため、遅いリクエストを待つ
+    assert result == [{"day": 1, "slow": True}]
+    assert hedging.hedges_sent == 0
+    mock_requests_get.assert_called_once()
+
+
+def test_hedging_delay_uses_observed_quantile():
+    """十分なサンプルがあれば、観測したレイテンシの分位点を待ち時間にすることのテスト"""
+    hedging = HedgingPolicy(delay=1.0, quantile=0.95, min_samples=20)
+    assert hedging.hedge_delay() == 1.0
+    
+    for i in range(100):
+        hedging.record_latency(i / 100)
+    
+    assert hedging.hedge_delay() == pytest.approx(0.95)
+
+
+def test_hedging_delay_updates_after_window_is_full():
+    """ウィンドウが埋まった後も、分位点が計算し直されることのテスト"""
+    hedging = HedgingPolicy(quantile=0.5, window_size=10, min_samples=5)
+    for _ in range(50):
+        hedging.record_latency(0.1)
+    assert hedging.hedge_delay() == pytest.approx(0.1)
+    
+    for _ in range(50):
+        hedging.record_latency(0.5)
+    
+    assert hedging.hedge_delay() == pytest.approx(0.5)
+
+
+def test_persistent_cache_warms_after_restart(tmp_path, mock_requests_get,
+                                              mock_api_response_success):
+    """再起動後も、永続キャッシュから値を返せることのテスト"""
+    db_path = str(tmp_path / "weather.db")
+    mock_requests_get.return_value = mock_api_response_success(
+        {"forecast": [{"day": 1, "temperature": 25}]}
+    )
+    
+    store = SQLiteWeatherStore(db_path)
+    service = WeatherService(api_key="test_api_key", cache=WeatherCache(store=store))
+    service.get_forecast("Tokyo", days=1)
+    store.close()
+    
+    # 再起動（新しいインスタンス）
+    mock_requests_get.reset_mock()
+    restarted_store = SQLiteWeatherStore(db_path)
+    restarted = WeatherService(api_key="test_api_key", cache=WeatherCache(store=restarted_store))
+    
+    assert restarted.get_forecast("Tokyo", days=1) == [{"day": 1, "temperature": 25}]
+    mock_requests_get.assert_not_called()
+    restarted_store.close()
+
+
+def test_persistent_cache_keeps_age(tmp_path):
+    """再起動をまたいでも、取得してからの経過時間が引き継がれることのテスト"""
+    store = SQLiteWeatherStore(str(tmp_path / "weather.db"))
+    with patch("services.weather_service.time.time", return_value=1000.0):
+        store.save(("weather", "Tokyo", None), {"city": "Tokyo"})
+    
+    with patch("services.weather_service.time.time", return_value=1100.0):
+        cache = WeatherCache(ttls={"weather": 60}, stale_while_revalidate=300, store=store)
+    
+    assert cache.lookup(("weather", "Tokyo", None)) == ({"city": "Tokyo"}, "stale")
+    store.close()
+
+
+def test_persistent_cache_compaction(tmp_path):
+    """古いエントリと、上限を超えたエントリが削除されることのテスト"""
+    store = SQLiteWeatherStore(str(tmp_path / "weather.db"), max_entries=2, max_age=155)
+    for i, city in enumerate(["Tokyo", "Osaka", "Nagoya", "Fukuoka"]):
+        with patch("services.weather_service.time.time", return_value=1000.0 + i * 50):
+            store.save(("weather", city, None), {"city": city})
+    
+    with patch("services.weather_service.time.time", return_value=1160.0):
+        entries = store.load()
+    
+    # Tokyo は古すぎ、Osaka は上限を超えるため削除される
+    assert [key[1] for key, _, _ in entries] == ["Fukuoka", "Nagoya"]
+    store.close()
+
+
+def test_persistent_cache_writes_behind(tmp_path):
+    """save() はその場では書き込まず、まとめて1回で保存されることのテスト"""
+    db_path = str(tmp_path / "weather.db")
+    store = SQLiteWeatherStore(db_path, flush_interval=60)
+    
+    def _count_rows():
+        with closing(sqlite3.connect(db_path)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM weather_cache").fetchone()[0]
+    
+    for city in ["Tokyo", "Osaka", "Tokyo"]:
+        store.save(("weather", city, None), {"city": city})
+    assert _count_rows() == 0
+    
+    store.flush()
+    # 同じキーへの書き込みは1件にまとめられる
+    assert _count_rows() == 2
+    store.close()
+
+
+def test_service_close_flushes_persistent_cache(tmp_path, mock_requests_get,
+                                                mock_api_response_success):
+    """WeatherService.close() で、ためておいた書き込みが保存されることのテスト"""
+    db_path = str(tmp_path / "weather.db")
+    mock_requests_get.return_value = mock_api_response_success(
+        {"city": "Tokyo", "temperature": 25, "condition": "Sunny"}
+    )
+    store = SQLiteWeatherStore(db_path, flush_interval=60)
+    
+    with WeatherService(api_key="test_api_key", cache=WeatherCache(store=store)) as service:
+        service.get_weather("Tokyo")
+    
+    restarted_store = SQLiteWeatherStore(db_path)
+    assert [key for key, _, _ in restarted_store.load()] == [("weather", "Tokyo", None)]
+    restarted_store.close()
+
+
+def test_rate_limiter_shared_per_api_key():
+    """同じ API キーのインスタンス間で、レート制限が共有されることのテスト"""
+    service1 = WeatherService(api_key="shared_key", rate_limit=5)
+    service2 = WeatherService(api_key="shared_key", rate_limit=5)
+    other = WeatherService(api_key="other_key", rate_limit=5)
+    
+    assert service1.rate_limiter is service2.rate_limiter
+    assert service1.rate_limiter is not other.rate_limiter
+
+
+def test_rate_limiter_waits_for_tokens():
+    """トークンがなくなったら、補充されるまで待つことのテスト"""
+    limiter = RateLimiter(rate=20, burst=2)
+    
+    started = time.monotonic()
+    for _ in range(3):
+        assert limiter.acquire()
+    
+    # 3個目は 1/20 秒待つ
+    assert time.monotonic() - started >= 0.04
+    assert limiter.try_acquire() is False
+    assert limiter.acquire(timeout=0.001) is False
+
+
+def test_rate_limiter_priority():
+    """優先度の高いリクエストが、先に待っていた低優先度のリクエストより先に送られることのテスト"""
+    limiter = RateLimiter(rate=10, burst=1)
+    limiter.acquire()
+    order = []
+    
+    bulk = threading.Thread(target=lambda: (limiter.acquire(PRIORITY_BULK), order.append("bulk")))
+    bulk.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(
+        target=lambda: (limiter.acquire(PRIORITY_INTERACTIVE), order.append("interactive"))
+    )
+    interactive.start()
+    bulk.join()
+    interactive.join()
+    
+    assert order == ["interactive", "bulk"]
+
+
+def test_rate_limit_timeout_does_not_block_half_open_probe(mock_requests_get,
+                                                            mock_api_response_success):
+    """トークン待ちで期限切れになっても、半開きの試行が残らないことのテスト"""
+    mock_requests_get.return_value = mock_api_response_success(
+        {"city": "Tokyo", "temperature": 25, "condition": "Sunny"}
+    )
+    breaker = CircuitBreaker(failure_rate=0.5, window_size=2, min_calls=1, reset_timeout=0)
+    breaker.record_failure()
+    service = WeatherService(
+        api_key="probe_key", deadline=1.0, circuit_breaker=breaker, rate_limit=100
+    )
+    
+    with patch.object(service.rate_limiter, "acquire", return_value=False):
+        with pytest.raises(DeadlineExceeded):
+            service.get_weather("Tokyo")
+    
+    # 半開きの試行は確保されていないので、次のリクエストで試せる
+    assert service.get_weather("Tokyo")["city"] == "Tokyo"
+    assert breaker.state == "closed"
+
+
+def test_get_forecast_uses_bulk_priority(mock_requests_get, mock_api_response_success):
+    """get_forecast は低い優先度でトークンを取得することのテスト"""
+    mock_requests_get.return_value = mock_api_response_success({"forecast": []})
+    service = WeatherService(api_key="priority_key", rate_limit=100)
+    
+    with patch.object(service.rate_limiter, "acquire", return_value=True) as mock_acquire:
+        service.get_forecast("Tokyo")
+        service.get_weather("Tokyo")
+    
+    assert [c[0][0] for c in mock_acquire.call_args_list] == [PRIORITY_BULK, PRIORITY_INTERACTIVE]
+
+
+def test_get_forecast_conditional_request(mock_requests_get, mock_api_response_success):
+    """304 の場合、前回解析したリストが再利用されることのテスト"""
+    first = mock_api_response_success({"forecast": [{"day": 1, "temperature": 25}]})
+    first.headers = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+    not_modified = Mock()
+    not_modified.status_code = 304
+    not_modified.raise_for_status = Mock()
+    mock_requests_get.side_effect = [first, not_modified]
+    service = WeatherService(api_key="test_api_key", revalidate_forecasts=True)
+    
+    result1 = service.get_forecast("Tokyo", days=1)
+    result2 = service.get_forecast("Tokyo", days=1)
+    
+    assert result2 is result1
+    assert service.not_modified_count == 1
+    not_modified.json.assert_not_called()
+    
+    # 1回目は検証子なし、2回目は保存した検証子を送る
+    assert "headers" not in mock_requests_get.call_args_list[0][1]
+    headers = mock_requests_get.call_args_list[1][1]["headers"]
+    assert headers == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"
+    }
+
+
+def test_get_forecast_conditional_request_modified(mock_requests_get, mock_api_response_success):
+    """内容が変わっていた場合は、新しいレスポンスと検証子を使うことのテスト"""
+    first = mock_api_response_success({"forecast": [{"day": 1, "condition": "Sunny"}]})
+    first.headers = {"ETag": '"v1"'}
+    second = mock_api_response_success({"forecast": [{"day": 1, "condition": "Rainy"}]})
+    second.headers = {"ETag": '"v2"'}
+    third = mock_api_response_success({"forecast": []})
+    third.headers = {}
+    mock_requests_get.side_effect = [first, second, third]
+    service = WeatherService(api_key="test_api_key", revalidate_forecasts=True)
+    
+    service.get_forecast("Tokyo", days=1)
+    assert service.get_forecast("Tokyo", days=1)[0]["condition"] == "Rainy"
+    service.get_forecast("Tokyo", days=1)
+    
+    assert mock_requests_get.call_args_list[2][1]["headers"] == {"If-None-Match": '"v2"'}
+    assert service.not_modified_count == 0
@@ -0,0 +1,68 @@
+"""
+天気APIを模擬するローカルHTTPサーバー
+テストとベンチマークで、実際の通信（コネクションの再利用など）を確認するために使います。
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _WeatherStubHandler(BaseHTTPRequestHandler):
+    """天気APIを模擬するHTTPハンドラ（keep-alive に対応するため HTTP/1.1 で応答する）"""
+    
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に送るため、Nagle アルゴリズムで keep-alive 時に遅延しないようにする
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        city = params.get("city", "")
+        
+        if url.path == "/weather":
+            body = {"city": city, "temperature": 25, "condition": "Sunny"}
+        elif url.path == "/forecast":
+            days = int(params.get("days", 3))
+            body = {
+                "forecast": [
+                    {"day": day, "temperature": 20 + day, "condition": "Sunny"}
+                    for day in range(1, days + 1)
+                ]
+            }
+        else:
+            self.send_error(404)
+            return
+        
+        self.server.request_count += 1
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        # テスト出力にアクセスログを出さない
+        pass
+
+
+
+def start_weather_stub_server() -> ThreadingHTTPServer:
+    """
+    天気APIのスタブサーバーをバックグラウンドで起動する
+    
+    Returns:
+        起動したサーバー（url 属性にベースURL、request_count 属性に受け付けたリクエスト数）
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WeatherStubHandler)
+    server.daemon_threads = True
+    server.request_count = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    # shutdown() がすぐに終わるように、ポーリング間隔を短くする
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    return server